@@ -0,0 +1,189 @@
+from typing import Dict, List, Tuple
+import os
+import glob
+import random
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+import hypergraphx as hgx
+
+from loaders import load_hypergraph
+from monte_carlo_max_hop import monte_carlo_max_hop_simulation
+from hdd.hdd import high_degree_discount_prefixes
+
+# columns identifying a benchmark case, used to compare against a baseline
+KEY_COLUMNS = ["dataset", "model", "strategy", "k"]
+
+def benchmark_seed_sets(hypergraph: hgx.Hypergraph, strategies: List[str], ks: List[int], rng: random.Random) -> Dict[Tuple[str,int],List[int]]:
+    """
+    Fixed seed sets of the benchmark, for each strategy and size.
+
+    random : nodes sampled uniformly at random
+    high_degree : nodes with the highest hyperdegree
+    hdd : nodes selected by High Degree Discount
+    """
+    nodes = hypergraph.get_nodes()
+    ks = [k for k in ks if k <= len(nodes)]
+    seed_sets = dict()
+    if "random" in strategies:
+        sample = rng.sample(nodes, max(ks))
+        for k in ks:
+            seed_sets[("random", k)] = sample[:k]
+    if "high_degree" in strategies:
+        node_sorted = sorted(nodes, key=lambda n: hypergraph.degree(n), reverse=True)
+        for k in ks:
+            seed_sets[("high_degree", k)] = node_sorted[:k]
+    if "hdd" in strategies:
+        for k, seed_set in zip(ks, high_degree_discount_prefixes(hypergraph, ks)):
+            seed_sets[("hdd", k)] = seed_set
+    return seed_sets
+
+def benchmark_case(seed_set: List[int], args) -> Dict:
+    """
+    Run monte_carlo_max_hop_simulation on the seed set args["repetitions"]
+    times, each time with a pseudo-random number generator initialized with the
+    same seed, so that every repetition does the same work and the variance
+    across repetitions only reflects the execution time. The peak memory is
+    measured in one more repetition, since tracemalloc slows down the
+    execution.
+    """
+    def run():
+        return monte_carlo_max_hop_simulation(
+            hypergraph=args["hypergraph"],
+            degree_dict=args["degree_dict"],
+            neighbor_dict=args["neighbor_dict"],
+            incident_hyperedge_dict=args["incident_hyperedge_dict"],
+            a=set(seed_set),
+            t=args["threshold"],
+            p_min=args["p_min"],
+            p_max=args["p_max"],
+            no_simulations=args["no_simulations"],
+            max_hop=args["max_hop"],
+            model=args["model"],
+            random_generator=random.Random(args["random_seed"])
+        )
+
+    seconds = list()
+    for _ in range(args["repetitions"]):
+        start_time = time.perf_counter()
+        influence_mean, influence_std, attempts = run()
+        seconds.append(time.perf_counter() - start_time)
+
+    tracemalloc.start()
+    run()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # LT is deterministic, hence it is simulated only once
+    no_simulations = 1 if args["model"] == "LT" else args["no_simulations"]
+    seconds_mean = float(np.mean(seconds))
+    return {
+        "no_simulations": no_simulations,
+        "repetitions": args["repetitions"],
+        "seconds_mean": seconds_mean,
+        "seconds_std": float(np.std(seconds)),
+        "seconds_min": float(np.min(seconds)),
+        "simulations_per_second": no_simulations / seconds_mean,
+        "activation_attempts": attempts,
+        "activation_attempts_per_second": attempts / seconds_mean,
+        "influence_mean": float(influence_mean),
+        "influence_std": float(influence_std),
+        "peak_memory_mb": peak_memory / 2**20
+    }
+
+def compare_with_baseline(results: pd.DataFrame, baseline: pd.DataFrame, tolerance: float, z: float) -> pd.DataFrame:
+    """
+    Speedup of the current results over the baseline ones (baseline mean
+    seconds over current mean seconds), case by case. A case is a regression
+    when its slowdown exceeds both the tolerance and z times the spread of the
+    repetitions of the two runs (square root of the sum of their variances),
+    so that the noise of the machine is not reported as a regression. The
+    activation attempts of the two runs are reported too, since a difference
+    means that the kernels do not do the same work anymore.
+    """
+    comparison = results.merge(baseline, on=KEY_COLUMNS, suffixes=("", "_baseline"))
+    comparison["speedup"] = comparison["seconds_mean_baseline"] / comparison["seconds_mean"]
+    spread = np.sqrt(comparison["seconds_std"]**2 + comparison["seconds_std_baseline"]**2)
+    slowdown = comparison["seconds_mean"] - comparison["seconds_mean_baseline"]
+    comparison["slowdown_z"] = slowdown / spread
+    comparison["same_activation_attempts"] = comparison["activation_attempts"] == comparison["activation_attempts_baseline"]
+    comparison["regression"] = (slowdown > tolerance * comparison["seconds_mean_baseline"]) & (slowdown > z * spread)
+    return comparison[KEY_COLUMNS + ["seconds_mean_baseline", "seconds_mean", "speedup", "slowdown_z", "same_activation_attempts", "regression"]]
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Microbenchmark of the propagation models.")
+
+    parser.add_argument("--hypergraph_paths", type=str, nargs="+", default=None, help="File paths of the JSON files encoding the hypergraphs (default: every JSON file in --data_dir).")
+    parser.add_argument("--data_dir", type=str, default="data", help="Directory of the hypergraph dataset.")
+    parser.add_argument("--models", type=str, nargs="+", default=["WC", "LT", "SICP"], choices=["WC", "LT", "SICP"], help="Influence propagation models.")
+    parser.add_argument("--strategies", type=str, nargs="+", default=["random", "high_degree", "hdd"], choices=["random", "high_degree", "hdd"], help="Strategies used to build the seed sets.")
+    parser.add_argument("--seed_set_sizes", type=int, nargs="+", default=[10, 50, 100], help="Sizes of the seed sets.")
+    parser.add_argument("--repetitions", type=int, default=3, help="Number of timed repetitions of each case.")
+    parser.add_argument("--random_seed", type=int, default=42, help="Seed to initialize the pseudo-random number generation.")
+
+    parser.add_argument('--threshold', type=float, default=0.8, help='Threshold for LT propagation model.')
+    parser.add_argument('--p_min', type=float, default=0.005, help='Probability MIN for SICP propagation model.')
+    parser.add_argument('--p_max', type=float, default=0.02, help='Probability MAX for SICP propagation model.')
+    parser.add_argument('--max_hop', type=int, default=5, help='Number of max hops for the Monte Carlo max hop function.')
+    parser.add_argument('--no_simulations', type=int, default=100, help='Number of simulations for spread calculation.')
+
+    parser.add_argument("--output_file_path", type=str, default="output/benchmark_models.csv", help="File path of the CSV file where to store the results.")
+    parser.add_argument("--baseline_file_path", type=str, default=None, help="File path of the CSV file with the results of a previous execution to compare with.")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Relative slowdown over the baseline tolerated before reporting a regression.")
+    parser.add_argument("--regression_z", type=float, default=2.0, help="Number of standard deviations of the seconds of the repetitions (of the two runs together) a slowdown must exceed to be reported as a regression.")
+
+    args = parser.parse_args()
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+    rng = random.Random(args["random_seed"])
+
+    hypergraph_paths = args["hypergraph_paths"]
+    if hypergraph_paths is None:
+        hypergraph_paths = sorted(glob.glob(os.path.join(args["data_dir"], "*.json")))
+
+    rows = list()
+    for hypergraph_path in hypergraph_paths:
+        dataset = os.path.splitext(os.path.basename(hypergraph_path))[0]
+        hypergraph = load_hypergraph(hypergraph_path)
+        print(hypergraph)
+
+        # degree, neighbor list, incident hyperedge list pre-computation
+        degree_dict:Dict[int,int] = dict()
+        neighbor_dict:Dict[int,List[int]] = dict()
+        incident_hyperedge_dict:Dict[int,List[Tuple[int]]] = dict()
+        for n in hypergraph.get_nodes():
+            degree_dict[n] = len(hypergraph.get_neighbors(n))
+            neighbor_dict[n] = hypergraph.get_neighbors(n)
+            incident_hyperedge_dict[n] = hypergraph.get_incident_edges(n)
+        args["hypergraph"] = hypergraph
+        args["degree_dict"] = degree_dict
+        args["neighbor_dict"] = neighbor_dict
+        args["incident_hyperedge_dict"] = incident_hyperedge_dict
+
+        seed_sets = benchmark_seed_sets(hypergraph, args["strategies"], args["seed_set_sizes"], rng)
+        for model in args["models"]:
+            args["model"] = model
+            for (strategy, k), seed_set in seed_sets.items():
+                row = {"dataset": dataset, "model": model, "strategy": strategy, "k": k}
+                row.update(benchmark_case(seed_set, args))
+                rows.append(row)
+                print(f"{dataset} {model} {strategy} k={k}: {row['simulations_per_second']:.1f} simulations/s, {row['activation_attempts_per_second']:.0f} attempts/s, {row['peak_memory_mb']:.2f} MB")
+
+    results = pd.DataFrame(rows)
+    output_folder_path = os.path.dirname(args["output_file_path"])
+    if output_folder_path:
+        os.makedirs(output_folder_path, exist_ok=True)
+    results.to_csv(args["output_file_path"], index=False)
+
+    if args["baseline_file_path"] is not None:
+        comparison = compare_with_baseline(results, pd.read_csv(args["baseline_file_path"]), args["tolerance"], args["regression_z"])
+        print("\nComparison with the baseline")
+        print(comparison.to_string(index=False))
+        print(f"\ngeometric mean speedup: {np.exp(np.mean(np.log(comparison['speedup'])))}")
+        print(f"regressions: {int(comparison['regression'].sum())}/{len(comparison)}")
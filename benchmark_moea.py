@@ -0,0 +1,152 @@
+from typing import Dict, List, Tuple
+import os
+import random
+import argparse
+import itertools
+import time
+import numpy as np
+import pandas as pd
+
+from loaders import node_degree
+from smart_initialization import create_initial_population
+from moea import moea_influence_maximization
+from config import default_config
+from session import new_session
+
+import collections
+collections.Mapping = collections.abc.Mapping
+collections.Sequence = collections.abc.Sequence
+collections.Iterable = collections.abc.Iterable
+
+# columns identifying a job configuration
+CONFIG_COLUMNS = ["dataset", "model", "evaluator", "n_threads", "population_size", "no_simulations", "run"]
+
+def run_job(job: Dict, data: Dict, args, output_folder_path: str) -> pd.DataFrame:
+    """
+    Run one main.py-equivalent execution of the MOEA and return its hypervolume
+    curve: for each generation the number of evaluations, the wall-clock seconds
+    since the beginning of the job (initialization included) and the HV.
+    """
+    os.makedirs(output_folder_path, exist_ok=True)
+
+    # each job starts from the same seed whatever the jobs executed before it
+    seed = args["random_seed"] + job["run"]
+    rng = random.Random(seed)
+
+    start_time = time.time()
+
+    # smart initialization
+    initial_population = create_initial_population(hypergraph=data["hypergraph"],
+                                                   min_k=args["min_seed_nodes"],
+                                                   max_k=args["init_seed_set_size"],
+                                                   n=job["population_size"],
+                                                   degree_function=node_degree,
+                                                   prng=rng)
+    init_seconds = time.time() - start_time
+
+    # arguments of main.py, the streamed files of main.py but the timing one
+    # and no checkpoint
+    config = default_config()
+    config.update({c: args[c] for c in ["min_seed_nodes", "max_generations", "tournament_size", "mutation_rate", "crossover_rate",
+                                        "num_elites", "threshold", "p_min", "p_max", "max_hop"]})
+    config.update({"population_size": job["population_size"], "offspring_size": job["population_size"], "model": job["model"],
+                   "no_simulations": job["no_simulations"], "n_threads": job["n_threads"], "delta_evaluation": job["evaluator"] == "delta",
+                   "output_timing_file_name": None, "checkpoint_interval": 0})
+    moea_influence_maximization(session=data,
+                                config=config,
+                                random_gen=rng,
+                                initial_population=initial_population,
+                                max_seed_nodes=args["init_seed_set_size"]/data["hypergraph"].num_nodes(),
+                                output_folder_run_path=output_folder_path)
+
+    # the generations file records the seconds of each generation
+    curve = pd.read_csv(f"{output_folder_path}/moea_generations.csv")
+    curve["seconds"] = init_seconds + curve["seconds"].cumsum()
+    return curve[["generation", "num_evaluations", "seconds", "hv"]]
+
+def time_to_target(curves: pd.DataFrame, target_fractions: List[float]) -> pd.DataFrame:
+    """
+    For each job, the wall-clock seconds and the evaluations needed to first
+    reach a target HV. The targets are fractions of the best final HV reached
+    by any job on the same dataset and model, so that all configurations are
+    compared against the same targets. Jobs never reaching a target get NaN.
+    """
+    final = curves.groupby(CONFIG_COLUMNS, as_index=False).last()
+    reference = final.groupby(["dataset", "model"])["hv"].max().rename("reference_hv")
+
+    rows = list()
+    for config, curve in curves.groupby(CONFIG_COLUMNS):
+        row = dict(zip(CONFIG_COLUMNS, config))
+        row["final_hv"] = curve["hv"].iloc[-1]
+        row["seconds"] = curve["seconds"].iloc[-1]
+        row["num_evaluations"] = curve["num_evaluations"].iloc[-1]
+        row["reference_hv"] = reference[(row["dataset"], row["model"])]
+        for fraction in target_fractions:
+            reached = curve[curve["hv"] >= fraction*row["reference_hv"]]
+            row[f"seconds_to_{fraction}"] = reached["seconds"].iloc[0] if len(reached) else np.nan
+            row[f"evaluations_to_{fraction}"] = reached["num_evaluations"].iloc[0] if len(reached) else np.nan
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark of MOEA configurations.")
+
+    parser.add_argument("--hypergraph_paths", type=str, nargs="+", default=["data/restaurant.json"], help="File paths of the JSON files encoding the hypergraphs.")
+    parser.add_argument("--models", type=str, nargs="+", default=["WC"], choices=["WC", "LT", "SICP"], help="Influence propagation models.")
+    parser.add_argument("--evaluators", type=str, nargs="+", default=["standard"], choices=["standard", "delta"], help="Evaluator backends: standard Monte Carlo simulation or delta evaluation.")
+    parser.add_argument("--n_threads", type=int, nargs="+", default=[1], help="Numbers of threads to handle parallel computation.")
+    parser.add_argument("--population_sizes", type=int, nargs="+", default=[100], help="EA population (and offspring) sizes.")
+    parser.add_argument("--no_simulations", type=int, nargs="+", default=[100], help="Numbers of simulations for spread calculation.")
+    parser.add_argument("--no_runs", type=int, default=1, help="Number of runs of each configuration, run r uses random_seed+r.")
+    parser.add_argument("--random_seed", type=int, default=42, help="Seed to initialize the pseudo-random number generation.")
+
+    parser.add_argument("--min_seed_nodes", type=int, default=1, help="Minimum number of nodes in a seed set.")
+    parser.add_argument("--init_seed_set_size", type=int, default=100, help="Maximum number of nodes in a seed set.")
+    parser.add_argument('--max_generations', type=int, default=100, help='Generational budget.')
+    parser.add_argument('--tournament_size', type=int, default=5, help='EA tournament size.')
+    parser.add_argument('--mutation_rate', type=float, default=0.1, help='EA mutation rate.')
+    parser.add_argument('--crossover_rate', type=float, default=1.0, help='EA crossover rate.')
+    parser.add_argument('--num_elites', type=int, default=2, help='EA number of elite individuals.')
+    parser.add_argument('--threshold', type=float, default=0.8, help='Threshold for LT propagation model.')
+    parser.add_argument('--p_min', type=float, default=0.005, help='Probability MIN for SICP propagation model.')
+    parser.add_argument('--p_max', type=float, default=0.02, help='Probability MAX for SICP propagation model.')
+    parser.add_argument('--max_hop', type=int, default=5, help='Number of max hops for the Monte Carlo max hop function.')
+
+    parser.add_argument("--target_fractions", type=float, nargs="+", default=[0.9, 0.95, 0.99], help="Target HVs, as fractions of the best final HV on the same dataset and model.")
+    parser.add_argument('--out_dir', default='output/benchmark_moea', type=str, help='Location of the output directory.')
+
+    args = parser.parse_args()
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+
+    curves = list()
+    for hypergraph_path in args["hypergraph_paths"]:
+        dataset = os.path.splitext(os.path.basename(hypergraph_path))[0]
+        # hypergraph and its dictionaries, shared by the jobs of the dataset
+        data = new_session(hypergraph_path)
+
+        for model, evaluator, n_threads, population_size, no_simulations, run in itertools.product(
+                args["models"], args["evaluators"], args["n_threads"], args["population_sizes"], args["no_simulations"], range(args["no_runs"])):
+            job = {"dataset": dataset, "model": model, "evaluator": evaluator, "n_threads": n_threads,
+                   "population_size": population_size, "no_simulations": no_simulations, "run": run}
+            job_name = "_".join(str(job[c]) for c in CONFIG_COLUMNS)
+            print(f"\n=== job {job_name}")
+
+            curve = run_job(job, data, args, f"{args['out_dir']}/{job_name}")
+            for c in CONFIG_COLUMNS:
+                curve[c] = job[c]
+            curves.append(curve)
+            print(f"\n=== job {job_name}: final hv={curve['hv'].iloc[-1]} seconds={curve['seconds'].iloc[-1]}")
+
+    # HV against wall-clock time and evaluations of every job
+    curves = pd.concat(curves, ignore_index=True)[CONFIG_COLUMNS + ["generation", "num_evaluations", "seconds", "hv"]]
+    curves.to_csv(f"{args['out_dir']}/curves.csv", index=False)
+
+    summary = time_to_target(curves, args["target_fractions"])
+    summary.to_csv(f"{args['out_dir']}/summary.csv", index=False)
+    print("\nTime to target hypervolume")
+    print(summary.to_string(index=False))
@@ -0,0 +1,135 @@
+from typing import Dict, List, Tuple
+import os
+import glob
+import random
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from loaders import load_hypergraph
+from bitset import node_index, to_bitset
+from ea.crossover import ea_crossover, ea_bitset_crossover
+from ea.mutation import ea_global_random_mutation, ea_bitset_global_random_mutation
+
+# columns identifying a benchmark case, used to compare against a baseline
+KEY_COLUMNS = ["dataset", "operator", "genome", "k", "overlap"]
+
+# variation operators of each genome representation
+OPERATORS = {
+    ("crossover", "list"): ea_crossover,
+    ("crossover", "bitset"): ea_bitset_crossover,
+    ("mutation", "list"): ea_global_random_mutation,
+    ("mutation", "bitset"): ea_bitset_global_random_mutation
+}
+
+def benchmark_parents(nodes: List[int], k: int, overlap: float, no_pairs: int, rng: random.Random) -> List[Tuple[List[int],List[int]]]:
+    """
+    Pairs of parents of k nodes sharing round(overlap*k) of them. With overlap
+    1 the parents are identical, which is the case in which the crossover
+    mutates them before swapping their genes.
+    """
+    pairs = list()
+    for _ in range(no_pairs):
+        sample = rng.sample(nodes, 2*k)
+        shared = round(overlap*k)
+        pairs.append((sample[:k], sample[:shared] + sample[k:2*k-shared]))
+    return pairs
+
+def benchmark_case(operator, parents: List, args) -> Dict:
+    """
+    Apply the operator to all the pairs of parents args["repetitions"] times,
+    each time with a pseudo-random number generator initialized with the same
+    seed, and return the seconds per pair of parents.
+    """
+    seconds = list()
+    for _ in range(args["repetitions"]):
+        rng = random.Random(args["random_seed"])
+        start_time = time.perf_counter()
+        for candidate1, candidate2 in parents:
+            operator(rng, [candidate1, candidate2], args)
+        seconds.append((time.perf_counter() - start_time) / len(parents))
+
+    return {
+        "repetitions": args["repetitions"],
+        "microseconds_mean": float(np.mean(seconds))*1e6,
+        "microseconds_min": float(np.min(seconds))*1e6
+    }
+
+def compare_with_baseline(results: pd.DataFrame, baseline: pd.DataFrame) -> pd.DataFrame:
+    """
+    Speedup of the current results over the baseline ones, case by case, on
+    the fastest repetitions.
+    """
+    comparison = results.merge(baseline, on=KEY_COLUMNS, suffixes=("", "_baseline"))
+    comparison["speedup"] = comparison["microseconds_min_baseline"] / comparison["microseconds_min"]
+    return comparison[KEY_COLUMNS + ["microseconds_min_baseline", "microseconds_min", "speedup"]]
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Microbenchmark of the variation operators.")
+
+    parser.add_argument("--hypergraph_paths", type=str, nargs="+", default=None, help="File paths of the JSON files encoding the hypergraphs (default: every JSON file in --data_dir).")
+    parser.add_argument("--data_dir", type=str, default="data", help="Directory of the hypergraph dataset.")
+    parser.add_argument("--operators", type=str, nargs="+", default=["crossover", "mutation"], choices=["crossover", "mutation"], help="Variation operators (mutation is the global random mutation).")
+    parser.add_argument("--genomes", type=str, nargs="+", default=["list", "bitset"], choices=["list", "bitset"], help="Genome representations of the seed sets.")
+    parser.add_argument("--seed_set_sizes", type=int, nargs="+", default=[10, 50, 100], help="Sizes of the parents.")
+    parser.add_argument("--overlaps", type=float, nargs="+", default=[0.5, 1.0], help="Fractions of the nodes shared by the two parents.")
+    parser.add_argument("--no_pairs", type=int, default=200, help="Number of pairs of parents of each case.")
+    parser.add_argument("--repetitions", type=int, default=3, help="Number of timed repetitions of each case.")
+    parser.add_argument("--random_seed", type=int, default=42, help="Seed to initialize the pseudo-random number generation.")
+
+    parser.add_argument("--output_file_path", type=str, default="output/benchmark_variators.csv", help="File path of the CSV file where to store the results.")
+    parser.add_argument("--baseline_file_path", type=str, default=None, help="File path of the CSV file with the results of a previous execution to compare with.")
+
+    args = parser.parse_args()
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+    rng = random.Random(args["random_seed"])
+
+    hypergraph_paths = args["hypergraph_paths"]
+    if hypergraph_paths is None:
+        hypergraph_paths = sorted(glob.glob(os.path.join(args["data_dir"], "*.json")))
+
+    rows = list()
+    for hypergraph_path in hypergraph_paths:
+        dataset = os.path.splitext(os.path.basename(hypergraph_path))[0]
+        hypergraph = load_hypergraph(hypergraph_path)
+        print(hypergraph)
+
+        # arguments read by the operators
+        nodes = hypergraph.get_nodes()
+        args["nodes"] = nodes
+        args["node_index"] = node_index(nodes)
+        args["min_seed_nodes"] = 1
+        args["max_seed_nodes"] = len(nodes)
+        args["crossover_rate"] = 1.0
+        args["mutation_rate"] = 1.0
+
+        for k in [k for k in args["seed_set_sizes"] if 2*k <= len(nodes)]:
+            for overlap in args["overlaps"]:
+                parents = benchmark_parents(nodes, k, overlap, args["no_pairs"], rng)
+                for operator in args["operators"]:
+                    for genome in args["genomes"]:
+                        genome_parents = parents
+                        if genome == "bitset":
+                            genome_parents = [(to_bitset(c1, args["node_index"]), to_bitset(c2, args["node_index"])) for c1, c2 in parents]
+                        row = {"dataset": dataset, "operator": operator, "genome": genome, "k": k, "overlap": overlap}
+                        row.update(benchmark_case(OPERATORS[(operator, genome)], genome_parents, args))
+                        rows.append(row)
+                        print(f"{dataset} {operator} {genome} k={k} overlap={overlap}: {row['microseconds_min']:.1f} us")
+
+    results = pd.DataFrame(rows)
+    output_folder_path = os.path.dirname(args["output_file_path"])
+    if output_folder_path:
+        os.makedirs(output_folder_path, exist_ok=True)
+    results.to_csv(args["output_file_path"], index=False)
+
+    if args["baseline_file_path"] is not None:
+        comparison = compare_with_baseline(results, pd.read_csv(args["baseline_file_path"]))
+        print("\nComparison with the baseline")
+        print(comparison.to_string(index=False))
+        print(f"\ngeometric mean speedup: {np.exp(np.mean(np.log(comparison['speedup'])))}")
@@ -0,0 +1,79 @@
+from typing import Dict, List, Iterable
+import random
+
+# Packed bitset representation of the seed sets.
+#
+# The nodes of the hypergraph are numbered contiguously by their position in
+# hypergraph.get_nodes(), and a seed set is the Python int whose bit i is set
+# iff the i-th node is a seed. Python ints are arbitrary precision bitsets:
+# union, intersection and difference of two seed sets are word-parallel (one
+# machine operation per 30 nodes), their size is a popcount, and they are
+# immutable and hashable, hence they can be used as keys of the fitness and
+# simulation caches as they are.
+
+def node_index(nodes: List[int]) -> Dict[int,int]:
+    """
+    Position of each node in the list of the nodes of the hypergraph, which is
+    also its bit.
+    """
+    return {n: i for i, n in enumerate(nodes)}
+
+def to_bitset(a: Iterable[int], index: Dict[int,int]) -> int:
+    """
+    Bitset of the seed set a, index being the output of node_index.
+    """
+    bitset = 0
+    for n in a:
+        bitset |= 1 << index[n]
+    return bitset
+
+def bitset_nodes(bitset: int, nodes: List[int]) -> List[int]:
+    """
+    Seed set of the bitset, i.e. the nodes of its set bits in increasing bit
+    order.
+    """
+    a = list()
+    while bitset:
+        low = bitset & -bitset                                                  # lowest set bit
+        a.append(nodes[low.bit_length()-1])
+        bitset ^= low
+    return a
+
+def bitset_size(bitset: int) -> int:
+    """
+    Number of seeds of the bitset.
+    """
+    return bitset.bit_count()
+
+def drop_lowest_bits(bitset: int, k: int) -> int:
+    """
+    The bitset without its k lowest set bits (0 if it has no more than k set
+    bits).
+    """
+    for _ in range(k):
+        bitset &= bitset - 1
+    return bitset
+
+def nth_bit(bitset: int, k: int) -> int:
+    """
+    The k-th lowest set bit of the bitset (k starting from 0), as a bitset.
+    """
+    rest = drop_lowest_bits(bitset, k)
+    return rest & -rest
+
+def random_set_bit(rng: random.Random, bitset: int) -> int:
+    """
+    One of the set bits of the bitset, chosen uniformly at random.
+    """
+    return nth_bit(bitset, rng.randint(0, bitset_size(bitset)-1))
+
+def random_unset_bit(rng: random.Random, bitset: int, num_nodes: int) -> int:
+    """
+    One of the bits of the num_nodes nodes which are not set in the bitset,
+    chosen uniformly at random. The seed sets are small compared to the
+    hypergraph, hence a bit is drawn until it is not in the bitset.
+    """
+    while True:
+        bit = 1 << rng.randint(0, num_nodes-1)
+        if not bitset & bit:
+            return bit
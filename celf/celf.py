@@ -0,0 +1,242 @@
+from typing import Dict, Set, Tuple, List
+import os
+import sys
+import heapq
+import random
+import argparse
+import time
+import json
+import hypergraphx as hgx
+from loaders import load_hypergraph
+
+# the propagation models are shared with the MOEA
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from monte_carlo_max_hop import monte_carlo_max_hop_simulation
+
+def spread(seed_set: Set[int], args, stats: Dict[str,float]) -> float:
+    """
+    Estimate the influence of the seed set with the propagation model selected
+    in args, keeping track of the number of spread evaluations and activation
+    attempts in stats.
+    """
+    if len(seed_set) == 0:
+        return 0.0
+    influence_mean, influence_std, attempts = monte_carlo_max_hop_simulation(
+        hypergraph=args["hypergraph"],
+        degree_dict=args["degree_dict"],
+        neighbor_dict=args["neighbor_dict"],
+        incident_hyperedge_dict=args["incident_hyperedge_dict"],
+        a=seed_set,
+        t=args["threshold"],
+        p_min=args["p_min"],
+        p_max=args["p_max"],
+        no_simulations=args["no_simulations"],
+        max_hop=args["max_hop"],
+        model=args["model"],
+        random_generator=args["random_generator"]
+    )
+    stats["evaluations"] += 1
+    stats["activation_attempts"] += attempts
+    return influence_mean
+
+def naive_greedy(nodes: List[int], k: int, args) -> Tuple[List[int], Dict[str,float]]:
+    """
+    Greedy algorithm which, at each iteration, evaluates the marginal gain of
+    every node which is not in the seed set yet.
+
+    Returns
+    -------
+        the seed set (in order of selection) and the statistics of the execution.
+    """
+    stats = {"evaluations": 0, "activation_attempts": 0}
+    start_time = time.time()
+
+    seeds = []
+    seeds_spread = 0.0
+    for _ in range(k):
+        best_node, best_spread = None, -1
+        for node in nodes:
+            if node in seeds:
+                continue
+            s = spread(set(seeds+[node]), args, stats)
+            if s > best_spread:
+                best_node, best_spread = node, s
+        seeds.append(best_node)
+        seeds_spread = best_spread
+
+    stats["seconds"] = time.time() - start_time
+    stats["spread"] = seeds_spread
+    return seeds, stats
+
+def celf(nodes: List[int], k: int, args, plus_plus: bool=False) -> Tuple[List[int], Dict[str,float]]:
+    """
+    Cost-Effective Lazy Forward greedy algorithm as proposed in:
+    https://doi.org/10.1145/1281192.1281239
+    and, if plus_plus is True, its CELF++ variant as proposed in:
+    https://doi.org/10.1145/1963192.1963217
+
+    Thanks to submodularity, the marginal gain of a node computed in a previous
+    iteration is an upper bound of its current one. Nodes are kept in a max-heap
+    of stale marginal gains, and only the node on top of the heap is
+    re-evaluated: if it stays on top it is selected without evaluating the
+    others. CELF++ additionally computes the marginal gain of a node with respect
+    to the seed set plus the current best node, so that it does not need to be
+    recomputed if the current best node is the next seed.
+
+    Parameters
+    ----------
+    nodes : list[int]
+        Candidate seed nodes.
+    k : int
+        Cardinality of the seed set.
+    args
+        Propagation model parameters, see spread.
+    plus_plus : bool
+        Apply CELF++ optimization.
+
+    Returns
+    -------
+        the seed set (in order of selection) and the statistics of the execution.
+    """
+    stats = {"evaluations": 0, "activation_attempts": 0}
+    start_time = time.time()
+
+    # heap entries: [-mg1, node, flag, prev_best, mg2]
+    # mg1 = marginal gain of node w.r.t. the seed set of size flag
+    # mg2 = marginal gain of node w.r.t. the seed set of size flag plus prev_best (CELF++)
+    heap = []
+    cur_best, cur_best_gain = None, -1
+    for node in nodes:
+        mg1 = spread({node}, args, stats)
+        mg2 = 0.0
+        prev_best = None
+        if plus_plus and cur_best is not None:
+            prev_best = cur_best
+            mg2 = spread({node, cur_best}, args, stats) - cur_best_gain
+        heap.append([-mg1, node, 0, prev_best, mg2])
+        if mg1 > cur_best_gain:
+            cur_best, cur_best_gain = node, mg1
+    heapq.heapify(heap)
+
+    seeds = []
+    seeds_spread = 0.0
+    last_seed = None
+    cur_best, cur_best_gain = None, -1
+    while len(seeds) < k and heap:
+        entry = heap[0]
+        neg_mg1, node, flag, prev_best, mg2 = entry
+
+        if flag == len(seeds):
+            # the marginal gain is up to date and it is the largest one
+            heapq.heappop(heap)
+            seeds.append(node)
+            seeds_spread += -neg_mg1
+            last_seed = node
+            cur_best, cur_best_gain = None, -1
+            continue
+
+        if plus_plus and prev_best is not None and prev_best == last_seed and flag == len(seeds)-1:
+            # the marginal gain w.r.t. the new seed set has already been computed
+            mg1 = mg2
+        else:
+            mg1 = spread(set(seeds+[node]), args, stats) - seeds_spread
+            if plus_plus and cur_best is not None and cur_best != node:
+                prev_best = cur_best
+                mg2 = spread(set(seeds+[node, cur_best]), args, stats) - (seeds_spread+cur_best_gain)
+            else:
+                prev_best = None
+
+        heapq.heapreplace(heap, [-mg1, node, len(seeds), prev_best, mg2])
+        if mg1 > cur_best_gain:
+            cur_best, cur_best_gain = node, mg1
+
+    stats["seconds"] = time.time() - start_time
+    stats["spread"] = seeds_spread
+    return seeds, stats
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Influence Maximization on Hypergraph Networks")
+
+    parser.add_argument("--min_seed_nodes", type=int, default=1, help="Minimum number of nodes in a seed set.")
+    parser.add_argument("--max_seed_nodes", type=float, default=100, help="Maximum number of nodes in a seed set.")
+    parser.add_argument("--random_seed", type=int, default=42, help="Seed to initialize the pseudo-random number generation.")
+    parser.add_argument("--hypergraph_path", type=str, default="dataset/small/small.json", help="File path of the JSON file encoding the input hypergraph network.")
+    parser.add_argument('--k_step', type=int, default=1, help='The algorithm executes the algorithm for all several values of k (seed set size) within the interval [min-k, max-k]. With this parameter we specify how divide this interval. For example, if k=2 and min-k=1 and max_k=5 then we are going to execute the algorithm for k=1, k=3, k=5.')
+
+    parser.add_argument('--threshold', type=float, default=0.8, help='Threshold for LT propagation model.')
+    parser.add_argument('--p_min', type=float, default=0.005, help='Probability MIN for SICP propagation model.')
+    parser.add_argument('--p_max', type=float, default=0.02, help='Probability MAX for SICP propagation model.')
+    parser.add_argument('--max_hop', type=int, default=5, help='Number of max hops for the Monte Carlo max hop function.')
+    parser.add_argument('--model', default="WC", choices=['WC', 'LT', 'SICP'], help='Influence propagation model.')
+    parser.add_argument('--no_simulations', type=int, default=100, help='Number of simulations for spread calculation.')
+
+    parser.add_argument('--celf_plus_plus', action='store_true', help='Apply the CELF++ optimization.')
+    parser.add_argument('--compare_naive', action='store_true', help='Run also the naive greedy algorithm and report the speedup of CELF over it.')
+
+    parser.add_argument("--output_file_path", type=str, default="output/celf_solution/celf.json", help="File path of the output JSON file.")
+    parser.add_argument("--output_report_file_path", type=str, default="output/celf_solution/celf_report.json", help="File path of the JSON file where to store the number of evaluations, activation attempts and seconds.")
+
+    args = parser.parse_args()
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+    rng = random.Random(args["random_seed"])
+
+    # load hypergraph
+    inputHypergraph = load_hypergraph(args["hypergraph_path"])
+    print(inputHypergraph)
+
+    # calculate max seed set size based on network size
+    max_seed_set_size = int(args["max_seed_nodes"])
+    print(f"max_seed_set_size: {max_seed_set_size}")
+
+    # degree, neighbor list, incident hyperedge list pre-computation
+    degree_dict:Dict[int,int] = dict()
+    neighbor_dict:Dict[int,List[int]] = dict()
+    incident_hyperedge_dict:Dict[int,List[Tuple[int]]] = dict()
+    for n in inputHypergraph.get_nodes():
+        degree_dict[n] = len(inputHypergraph.get_neighbors(n))
+        neighbor_dict[n] = inputHypergraph.get_neighbors(n)
+        incident_hyperedge_dict[n] = inputHypergraph.get_incident_edges(n)
+
+    args["hypergraph"] = inputHypergraph
+    args["degree_dict"] = degree_dict
+    args["neighbor_dict"] = neighbor_dict
+    args["incident_hyperedge_dict"] = incident_hyperedge_dict
+    args["random_generator"] = rng
+
+    # greedy choices are prefix-nested, a single run gives the seed sets for all k
+    seeds, stats = celf(inputHypergraph.get_nodes(), max_seed_set_size, args, plus_plus=args["celf_plus_plus"])
+    algorithm = "CELF++" if args["celf_plus_plus"] else "CELF"
+    print(f"\n{algorithm}: {stats}")
+    report = {algorithm: stats}
+
+    if args["compare_naive"]:
+        naive_seeds, naive_stats = naive_greedy(inputHypergraph.get_nodes(), max_seed_set_size, args)
+        print(f"\nnaive greedy: {naive_stats}")
+        report["naive_greedy"] = naive_stats
+        report["speedup"] = {"activation_attempts": naive_stats["activation_attempts"]/max(stats["activation_attempts"],1),
+                             "seconds": naive_stats["seconds"]/max(stats["seconds"],1e-9)}
+        print(f"\nspeedup over naive greedy: {report['speedup']}")
+
+    output_seed_sets = list()
+    for k in range(args["min_seed_nodes"], max_seed_set_size+1, args["k_step"]):
+        output_seed_sets.append(seeds[:k])
+
+    print("\nComplete output")
+    print(output_seed_sets)
+
+    # save output to JSON file
+    json_object = json.dumps(output_seed_sets, indent=1)
+    output_file = open(args["output_file_path"], "w")
+    output_file.write(json_object)
+    output_file.close()
+
+    # save report to JSON file
+    json_object = json.dumps(report, indent=1)
+    output_file = open(args["output_report_file_path"], "w")
+    output_file.write(json_object)
+    output_file.close()
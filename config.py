@@ -0,0 +1,88 @@
+from typing import Dict
+import argparse
+
+# Arguments of main.py, which are also the configuration of a run of the
+# session (see session.py): a configuration holds the arguments whose value
+# differs from the default one.
+
+def argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Influence Maximization on Hypergraph Networks")
+    
+    parser.add_argument("--min_seed_nodes", type=int, default=1, help="Minimum number of nodes in a seed set.")
+    #parser.add_argument("--max_seed_nodes", type=float, default=0.1, help="Maximum number of nodes in a seed set as percentage of the whole network.")
+
+    parser.add_argument("--random_seed", type=int, default=42, help="Seed to initialize the pseudo-random number generation.")
+    parser.add_argument('--no_runs', type=int, default=1, help='EA number of runs.')
+    parser.add_argument('--n_threads', type=int, default=1, help="Number of threads to handle parallel computation.")
+
+    parser.add_argument("--hypergraph_path", type=str, default="dataset/small/small.json", help="File path of the JSON file encoding the input hypergraph network. (IF summary_input is True THEN this is the file path of the JSON file encoding the input summary)")
+    parser.add_argument('--output_file_name', type=str, default="moea.json", help='JSON file name where to store the individuals of the final pareto front at the end of the execution.')
+    parser.add_argument('--output_execution_time_file_name', type=str, default="moea_exec_time.txt", help='File name of the txt file where to store the execution time.')
+    parser.add_argument('--output_activation_attempts_file_name', type=str, default="moea_activation_attempts.csv", help='File name of the csv file where to store the number of activation attempts.')
+    parser.add_argument('--output_hypervolume_file_name', type=str, default="moea_hypervolume.csv", help='File name of the csv file where to store hypervolume for each generation.')
+    parser.add_argument('--output_generations_file_name', type=str, default="moea_generations.csv", help='File name of the csv file where to store number of evaluations, hypervolume, Pareto front size, activation attempts and seconds of each generation.')
+    parser.add_argument('--output_timing_file_name', type=str, default="moea_timing.jsonl", help='File name of the JSON-lines file where to store the wall time of each phase (evaluation, crossover, mutation, archiving, hypervolume, selection, ...) and the throughput of each generation.')
+    parser.add_argument('--output_kernel_counters_file_name', type=str, default="moea_kernel_counters.jsonl", help='File name of the JSON-lines file where to store the hot-path counters of the propagation models (see --kernel_counters).')
+    parser.add_argument('--output_surrogate_file_name', type=str, default="moea_surrogate.csv", help='File name of the csv file where to store the number of offspring simulated and screened out by the surrogate in each generation (see --surrogate).')
+    parser.add_argument('--output_checkpoint_file_name', type=str, default="moea_checkpoint.pkl", help='File name of the file where to store the checkpoint of the evolutionary state.')
+    parser.add_argument('--out_dir', default='output/', type=str, help='Location of the output directory.')
+    parser.add_argument('--checkpoint_interval', type=int, default=1, help='Number of generations between two checkpoints of the evolutionary state (0 to disable checkpoints).')
+    parser.add_argument('--resume', type=str, default=None, help='Output directory of an interrupted execution (e.g. output/20240101_120000) to be resumed from the last checkpoint of each run. The other arguments must be the same of the interrupted execution.')
+
+    parser.add_argument('--population_size', type=int, default=100, help='EA population size.')
+    parser.add_argument('--offspring_size', type=int, default=100, help='EA offspring size.')
+    parser.add_argument('--max_generations', type=int, default=100, help='Generational budget.')
+    parser.add_argument('--max_seconds', type=float, default=None, help='Wall-clock budget of each run in seconds: the run stops when the next generation would not end in time. The time left is stored in the checkpoint, hence a resumed run only gets what the interrupted one did not use.')
+    parser.add_argument('--max_simulations', type=int, default=None, help='Budget of Monte Carlo simulations of each run.')
+    parser.add_argument('--max_activation_attempts', type=int, default=None, help='Budget of activation attempts of each run.')
+    parser.add_argument('--stagnation_generations', type=int, default=None, help='Stop a run when the hypervolume improved less than --stagnation_epsilon over this number of generations.')
+    parser.add_argument('--stagnation_epsilon', type=float, default=1e-4, help='Minimum hypervolume improvement over --stagnation_generations generations.')
+    parser.add_argument('--tournament_size', type=int, default=5, help='EA tournament size.')
+    parser.add_argument('--mutation_rate', type=float, default=0.1, help='EA mutation rate.')
+    parser.add_argument('--crossover_rate', type=float, default=1.0, help='EA crossover rate.')
+    parser.add_argument('--num_elites', type=int, default=2, help='EA number of elite individuals.')
+
+    parser.add_argument('--threshold', type=float, default=0.8, help='Threshold for LT propagation model.')
+    parser.add_argument('--p_min', type=float, default=0.005, help='Probability MIN for SICP propagation model.')
+    parser.add_argument('--p_max', type=float, default=0.02, help='Probability MAX for SICP propagation model.')
+    parser.add_argument('--max_hop', type=int, default=5, help='Number of max hops for the Monte Carlo max hop function.')
+    parser.add_argument('--model', default="WC", choices=['WC', 'LT', 'SICP'], help='Influence propagation model.')
+    parser.add_argument('--no_simulations', type=int, default=100, help='Number of simulations for spread calculation.')
+
+    parser.add_argument('--fidelity', default="fixed", choices=["fixed", "schedule", "stagnation"], help='Number of simulations during the run: fixed to --no_simulations, or starting from --min_simulations and doubled every --fidelity_interval generations (schedule) or when the hypervolume improved less than --fidelity_epsilon over --fidelity_interval generations (stagnation). The final Pareto front is evaluated again with --no_simulations.')
+    parser.add_argument('--min_simulations', type=int, default=10, help='Initial number of simulations with --fidelity schedule or stagnation.')
+    parser.add_argument('--fidelity_interval', type=int, default=10, help='Number of generations between two raises of the number of simulations.')
+    parser.add_argument('--fidelity_epsilon', type=float, default=1e-3, help='Minimum hypervolume improvement over --fidelity_interval generations with --fidelity stagnation.')
+
+    parser.add_argument('--warm_start_file_paths', type=str, nargs="+", default=None, help='JSON files of seed sets (baseline outputs such as hdd.json, high_degree.json, hci.json, or moea.json Pareto fronts) injected into the initial population, deduplicated and clipped to the maximum seed set size.')
+    parser.add_argument('--warm_start_size', type=int, default=None, help='Maximum number of seed sets injected with --warm_start_file_paths (default: half of the population), the rest of the initial population is built by the smart initialization.')
+    parser.add_argument('--custom_mutation', type=bool, default=False, help='Flag to decide to apply custom mutation operators or not.')
+    parser.add_argument('--kernel_counters', action='store_true', help='Count hops, frontier sizes, scanned hyperedges, random draws and early convergences inside the propagation models, for each candidate and generation (not available with --delta_evaluation).')
+    parser.add_argument('--surrogate', action='store_true', help='Pre-screen the offspring with a surrogate of the spread fitted online, and simulate only the ones which are not dominated by the Pareto archive with an optimistic surrogate estimate.')
+    parser.add_argument('--surrogate_z', type=float, default=1.0, help='Number of standard deviations of the surrogate residuals added to the surrogate estimate for the pre-screening.')
+    parser.add_argument('--surrogate_min_samples', type=int, default=50, help='Number of simulated seed sets needed before the pre-screening starts.')
+    parser.add_argument('--surrogate_max_samples', type=int, default=1000, help='Number of most recent simulated seed sets the surrogate is fitted to.')
+    parser.add_argument('--bitset_genome', action='store_true', help='Represent the seed sets as packed bitsets over the nodes instead of lists of nodes, so that crossover, mutation and the comparisons of the archiver are word-parallel (a resumed run must use the same representation).')
+    parser.add_argument('--no_deduplication', action='store_true', help='Simulate every offspring, instead of evaluating each distinct seed set once and giving the offspring identical to a member of the population its fitness.')
+    parser.add_argument('--remote_workers', type=str, nargs="+", default=None, help='Addresses (host:port) of the evaluation workers started with remote_evaluation.py on the same hypergraph, which evaluate the seed sets instead of the local threads (not available with --delta_evaluation and --kernel_counters).')
+    parser.add_argument('--local_workers', type=int, default=0, help='Number of evaluation workers to start on localhost as a stand-in for --remote_workers.')
+    parser.add_argument('--remote_batch_size', type=int, default=4, help='Number of seed sets sent to an evaluation worker at once.')
+    parser.add_argument('--remote_timeout', type=float, default=600.0, help='Seconds after which an evaluation worker which did not answer is considered lost, and its batch is sent to another one.')
+    parser.add_argument('--remote_retries', type=int, default=3, help='Number of times a batch is sent again after its evaluation worker is lost.')
+    parser.add_argument('--fitness_store_path', type=str, default=None, help='SQLite file of the spread estimates of the seed sets shared by the runs: the seed sets already simulated --no_simulations times on the same hypergraph and model setting are not simulated again, the simulations of the other ones are merged into their estimates.')
+    parser.add_argument('--accumulate_samples', action='store_true', help='Keep the running count, mean and M2 of the spread of every seed set evaluated during the run, and refine them with --top_up_simulations more simulations (instead of --no_simulations new ones) whenever the seed set is evaluated again, including the offspring identical to a member of the population; the population and the archive get the pooled fitness (not available with --delta_evaluation; with --fitness_store_path the estimates are the stored ones).')
+    parser.add_argument('--top_up_simulations', type=int, default=10, help='Number of simulations added to the estimate of a seed set evaluated again with --accumulate_samples.')
+    parser.add_argument('--delta_evaluation', action='store_true', help='Evaluate the offspring which differ by one gene from an already evaluated seed set by simulating only the added or removed seed, on common random numbers.')
+    parser.add_argument('--crn_seed', type=int, default=None, help='Seed of the random worlds of delta evaluation, the same for runs which have to be evaluated on the same worlds (default: drawn from the pseudo-random number generator of the run).')
+    parser.add_argument('--delta_max_distance', type=int, default=2, help='Maximum number of seeds added to or removed from an evaluated seed set for delta evaluation (a replaced gene counts 2).')
+
+    return parser
+
+# default value of the arguments, parsed once
+DEFAULT_CONFIG = vars(argument_parser().parse_args([]))
+
+def default_config() -> Dict:
+    """
+    Default value of the arguments of main.py.
+    """
+    return dict(DEFAULT_CONFIG)
@@ -0,0 +1,485 @@
+from typing import Dict, Set, Tuple, List, Optional
+import numpy as np
+import hypergraphx as hgx
+
+# Delta evaluation of the propagation models.
+#
+# The three propagation models of monte_carlo_max_hop.py can be rewritten as
+# hop-limited shortest path problems: every node gets a label equal to the hop
+# at which it is activated (0 for the seeds), and the label of a node is the
+# minimum over a set of rules fired by already active nodes.
+# - WC:   a live link u->w (sampled once per world) gives label(u)+1;
+# - LT:   a hyperedge h gets active at the hop in which the quota of its nodes
+#         is reached, and gives label a(h)+1 to all its nodes;
+# - SICP: an infected node n picks hyperedge e(n,t) at every hop t>=label(n)
+#         and infects each m in e(n,t) with a coin flip, giving label t+1.
+# Since WC and SICP are stochastic, their randomness is drawn from common
+# random numbers (CRN): every draw is a hash of the world seed and of the
+# (node, hop, node) involved, so the same world can be replayed on a different
+# seed set. LT is deterministic and reproduces lt_max_hop_model exactly.
+#
+# The stored state of a seed set (labels, histogram of labels, activation
+# attempts) can then be repaired when a seed is added or removed, touching only
+# the nodes whose label changes.
+
+INF = float("inf")
+_MASK64 = (1 << 64) - 1
+_MASK32 = (1 << 32) - 1
+
+def _mix64(x: int) -> int:
+    # splitmix64 finalizer, the common random numbers are obtained by chaining
+    # it over the world seed and the keys of the draw
+    x = (x + 0x9E3779B97F4A7C15) & _MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return x ^ (x >> 31)
+
+def world_seeds(crn_seed: int, no_worlds: int) -> List[int]:
+    """
+    Seeds of the random worlds shared by all the seed sets evaluated in a run.
+    """
+    return [_mix64(crn_seed ^ _mix64(w)) for w in range(no_worlds)]
+
+def empty_state(model: str, no_worlds: int, max_hop: int):
+    """
+    Simulation state of the empty seed set.
+    """
+    worlds = []
+    for _ in range(no_worlds):
+        worlds.append({"label": {},                                          # label[n] = hop at which node n is activated
+                       "hist": [0]*(max_hop+1),                             # hist[t] = number of nodes activated at hop t
+                       "attempts": [0]*max_hop if model=="SICP" else 0,     # activation attempts (per hop for SICP)
+                       "edges": {}})                                        # LT: edges[h][t] = number of nodes of h activated at hop t
+    return worlds
+
+def copy_state(state):
+    # the per hyperedge histograms are copied on write by _repair
+    return [{"label": w["label"].copy(),
+             "hist": w["hist"].copy(),
+             "attempts": w["attempts"].copy() if isinstance(w["attempts"], list) else w["attempts"],
+             "edges": w["edges"].copy()} for w in state]
+
+# === MODEL RULES ==============================================================
+def _lt_quota(ctx, size: int) -> int:
+    # smallest number of active nodes c such that c/size >= threshold
+    quota = ctx["quota"].get(size)
+    if quota is None:
+        t = ctx["threshold"]
+        quota = 1
+        while quota <= size and quota/size < t:
+            quota += 1
+        ctx["quota"][size] = quota
+    return quota
+
+def _lt_activation_hop(ctx, h, counts) -> float:
+    # hop at which hyperedge h gets active given the number of its nodes
+    # activated at each hop, INF if it never does
+    if counts is None:
+        return INF
+    quota = _lt_quota(ctx, len(h))
+    active = 0
+    for hop in range(ctx["max_hop"]):
+        active += counts[hop]
+        if active >= quota:
+            return hop
+    return INF
+
+def _lt_attempts(ctx, h, counts) -> int:
+    # activation attempts spent on hyperedge h: h is checked once for every
+    # node of h processed before h gets active, plus the activating check
+    if counts is None:
+        return 0
+    a = _lt_activation_hop(ctx, h, counts)
+    return sum(counts[:min(a, ctx["max_hop"])]) + (1 if a < INF else 0)
+
+def _sicp_hyperedge(ctx, ws: int, n: int, t: int):
+    # hyperedge chosen by node n at hop t
+    incident = ctx["incident_hyperedge_dict"][n]
+    return incident[(_mix64(_mix64(_mix64(ws ^ 1) ^ n) ^ t) * len(incident)) >> 64]
+
+def _sicp_infects(ctx, key: int, m: int) -> bool:
+    # does node n infect node m at hop t, key is _mix64(_mix64(_mix64(ws ^ 2) ^ n) ^ t)
+    # the low 32 bits give the coin and the high 32 bits give p in [p_min, p_max]
+    x = _mix64(key ^ m)
+    p = ctx["p_min"] + (ctx["p_max"]-ctx["p_min"])*((x >> 32)/4294967296.0)
+    return (x & _MASK32)/4294967296.0 <= p
+
+def _relax(ctx, ws: int, u: int, world, tight: bool=False):
+    """
+    Yield the (node, label) pairs proposed by the rules fired by node u to the
+    nodes which currently have a larger label, or, if tight is True, to the
+    nodes whose current label is exactly the proposed one.
+    """
+    model = ctx["model"]
+    max_hop = ctx["max_hop"]
+    label = world["label"]
+    du = label[u]
+    if model=="WC":
+        if du < max_hop:
+            # the link u->w is live with probability 1/degree(w)
+            degree_dict = ctx["degree_dict"]
+            key = _mix64(ws ^ u)
+            for w in ctx["neighbor_dict"][u]:
+                dw = label.get(w, INF)
+                if (dw == du+1 if tight else dw > du+1) and _mix64(key ^ w)*degree_dict[w] <= _MASK64:
+                    yield w, du+1
+    elif model=="LT":
+        edges = world["edges"]
+        for h in ctx["incident_hyperedge_dict"][u]:
+            a = _lt_activation_hop(ctx, h, edges.get(h))
+            # u only fires h if it is one of the nodes activating it
+            if a < INF and du <= a:
+                for w in h:
+                    dw = label.get(w, INF)
+                    if dw == a+1 if tight else dw > a+1:
+                        yield w, a+1
+    elif model=="SICP":
+        key_u = _mix64(_mix64(ws ^ 2) ^ u)
+        for t in range(du, max_hop):
+            key = _mix64(key_u ^ t)
+            for m in _sicp_hyperedge(ctx, ws, u, t):
+                dm = label.get(m, INF)
+                if (dm == t+1 if tight else dm > t+1) and _sicp_infects(ctx, key, m):
+                    yield m, t+1
+
+def _pull(ctx, ws: int, w: int, world) -> float:
+    """
+    Smallest label proposed to node w by the rules of the currently active nodes.
+    """
+    model = ctx["model"]
+    max_hop = ctx["max_hop"]
+    label = world["label"]
+    best = INF
+    if model=="WC":
+        degree_w = ctx["degree_dict"][w]
+        for u in ctx["neighbor_dict"][w]:
+            du = label.get(u, INF)
+            if du+1 < best and du < max_hop and _mix64(_mix64(ws ^ u) ^ w)*degree_w <= _MASK64:
+                best = du+1
+    elif model=="LT":
+        edges = world["edges"]
+        for h in ctx["incident_hyperedge_dict"][w]:
+            best = min(best, _lt_activation_hop(ctx, h, edges.get(h))+1)
+    elif model=="SICP":
+        key_2 = _mix64(ws ^ 2)
+        for u in ctx["neighbor_dict"][w]:
+            du = label.get(u, INF)
+            if du == INF:
+                continue
+            key_u = _mix64(key_2 ^ u)
+            for t in range(du, min(max_hop, best-1)):
+                if w in _sicp_hyperedge(ctx, ws, u, t) and _sicp_infects(ctx, _mix64(key_u ^ t), w):
+                    best = t+1
+                    break
+    return best
+
+# === FULL SIMULATION ==========================================================
+def _simulate(ctx, ws: int, seeds: Set[int]):
+    """
+    Simulate a world from scratch following the loops of monte_carlo_max_hop.py,
+    recording the label of every activated node.
+    """
+    model = ctx["model"]
+    max_hop = ctx["max_hop"]
+    world = empty_state(model, 1, max_hop)[0]
+    label = world["label"]
+    A = set(seeds)  # set of active nodes
+    B = set(seeds)  # set of nodes activated in the last time slot
+    for n in A:
+        label[n] = 0
+
+    if model=="WC":
+        degree_dict = ctx["degree_dict"]
+        neighbor_dict = ctx["neighbor_dict"]
+        time = 0
+        for hop in range(max_hop):
+            if not B:
+                break
+            nextB = set()
+            for n in B:
+                key = _mix64(ws ^ n)
+                candidates = neighbor_dict[n]-A
+                time += len(candidates)
+                for m in candidates:
+                    if _mix64(key ^ m)*degree_dict[m] <= _MASK64:
+                        nextB.add(m)
+            for m in nextB:
+                label[m] = hop+1
+            A.update(nextB)
+            B = nextB
+        world["attempts"] = time
+    elif model=="LT":
+        incident_hyperedge_dict = ctx["incident_hyperedge_dict"]
+        threshold = ctx["threshold"]
+        C = set()   # set of active hyperedges
+        time = 0
+        for hop in range(max_hop):
+            if not B:
+                break
+            nextB = set()
+            for n in B:
+                for h in incident_hyperedge_dict[n]:
+                    if h not in C:
+                        time += 1
+                        if len(A.intersection(h))/len(h) >= threshold:
+                            C.add(h)
+                            nextB.update(j for j in h if j not in A)
+            for m in nextB:
+                label[m] = hop+1
+            A.update(nextB)
+            B = nextB
+        world["attempts"] = time
+    elif model=="SICP":
+        # the labels are needed up to max_hop, hence the propagation does not
+        # stop at the first hop without new infections (see _world_outcome)
+        key_2 = _mix64(ws ^ 2)
+        attempts = world["attempts"]
+        for hop in range(max_hop):
+            nextI = set()
+            for n in A:
+                key = _mix64(_mix64(key_2 ^ n) ^ hop)
+                for m in _sicp_hyperedge(ctx, ws, n, hop):
+                    if m not in A:
+                        attempts[hop] += 1
+                        if _sicp_infects(ctx, key, m):
+                            nextI.add(m)
+            for m in nextI:
+                label[m] = hop+1
+            A.update(nextI)
+
+    for n, hop in label.items():
+        world["hist"][hop] += 1
+        if model=="LT":
+            for h in ctx["incident_hyperedge_dict"][n]:
+                counts = world["edges"].get(h)
+                if counts is None:
+                    counts = world["edges"][h] = [0]*(max_hop+1)
+                counts[hop] += 1
+    return world
+
+# === STATE REPAIR =============================================================
+def _repair(ctx, ws: int, world, removed: Set[int], added: Set[int]):
+    """
+    Update the labels of a world after removing and adding seeds, and then the
+    histogram and the activation attempts of the nodes whose label changed.
+    """
+    label = world["label"]
+    edges = world["edges"]
+    max_hop = ctx["max_hop"]
+    old = {}        # old[n] = label of node n before the repair
+    owned = set()   # LT: hyperedges whose histogram has already been copied
+
+    def set_label(w, c):
+        if w not in old:
+            old[w] = label.get(w, INF)
+        if ctx["model"]=="LT":
+            # keep the histogram and the activation attempts of the hyperedges
+            # of w up to date, the activation hop of a hyperedge depends on them
+            prev = label.get(w, INF)
+            for h in ctx["incident_hyperedge_dict"][w]:
+                counts = edges.get(h)
+                if h not in owned:
+                    counts = edges[h] = counts.copy() if counts is not None else [0]*(max_hop+1)
+                    owned.add(h)
+                world["attempts"] -= _lt_attempts(ctx, h, counts)
+                if prev < INF:
+                    counts[prev] -= 1
+                if c < INF:
+                    counts[c] += 1
+                world["attempts"] += _lt_attempts(ctx, h, counts)
+        if c == INF:
+            label.pop(w, None)
+        else:
+            label[w] = c
+
+    def propagate(buckets):
+        # Dijkstra with a bucket queue, the labels are integers in [0, max_hop]
+        for hop in range(max_hop+1):
+            for u in buckets[hop]:
+                if label.get(u) != hop:
+                    continue
+                for w, c in _relax(ctx, ws, u, world):
+                    if c < label.get(w, INF):
+                        set_label(w, c)
+                        buckets[c].append(w)
+
+    for v in removed:
+        # collect the nodes whose label might be supported by v
+        dirty = {v}
+        stack = [v]
+        while stack:
+            u = stack.pop()
+            for w, c in _relax(ctx, ws, u, world, tight=True):
+                if w not in dirty:
+                    dirty.add(w)
+                    stack.append(w)
+        for w in dirty:
+            set_label(w, INF)
+
+        # relabel them starting from the labels which are still valid
+        buckets = [[] for _ in range(max_hop+1)]
+        for w in dirty:
+            c = _pull(ctx, ws, w, world)
+            if c < INF:
+                set_label(w, c)
+                buckets[c].append(w)
+        propagate(buckets)
+
+    buckets = [[] for _ in range(max_hop+1)]
+    for v in added:
+        if label.get(v, INF) > 0:
+            set_label(v, 0)
+            buckets[0].append(v)
+    propagate(buckets)
+
+    changed = {n for n, l in old.items() if l != label.get(n, INF)}
+    _update_bookkeeping(ctx, ws, world, changed, old)
+
+def _update_bookkeeping(ctx, ws: int, world, changed: Set[int], old: Dict[int,float]):
+    model = ctx["model"]
+    max_hop = ctx["max_hop"]
+    label = world["label"]
+    hist = world["hist"]
+
+    for n in changed:
+        if old[n] < INF:
+            hist[old[n]] -= 1
+        if n in label:
+            hist[label[n]] += 1
+
+    if model=="WC":
+        # node n attempts to activate each neighbor m with a larger label, the
+        # pairs (n,m) with n or m changed are updated once
+        delta = 0
+        for u in changed:
+            du_new, du_old = label.get(u, INF), old[u]
+            for m in ctx["neighbor_dict"][u]:
+                dm_new = label.get(m, INF)
+                dm_old = old.get(m, dm_new)
+                delta += (du_new < max_hop and dm_new > du_new) - (du_old < max_hop and dm_old > du_old)
+                if m not in changed and dm_new < max_hop:
+                    delta += (du_new > dm_new) - (du_old > dm_new)
+        world["attempts"] += delta
+    elif model=="SICP":
+        # at hop t an infected node n attempts to infect each node of e(n,t)
+        # which is still susceptible, the triples (n,t,m) with n or m changed
+        # are updated once
+        attempts = world["attempts"]
+        for u in changed:
+            du_new, du_old = label.get(u, INF), old[u]
+            for t in range(min(du_new, du_old), max_hop):
+                for m in _sicp_hyperedge(ctx, ws, u, t):
+                    dm_new = label.get(m, INF)
+                    dm_old = old.get(m, dm_new)
+                    attempts[t] += (du_new <= t < dm_new) - (du_old <= t < dm_old)
+            for n in ctx["neighbor_dict"][u]:
+                dn = label.get(n, INF)
+                if n in changed or dn == INF:
+                    continue
+                for t in range(dn, max_hop):
+                    if (t < du_new) != (t < du_old) and u in _sicp_hyperedge(ctx, ws, n, t):
+                        attempts[t] += (t < du_new) - (t < du_old)
+
+def _world_outcome(model: str, world, max_hop: int) -> Tuple[int, int]:
+    """
+    Number of active nodes and activation attempts of a world.
+    """
+    if model!="SICP":
+        return len(world["label"]), world["attempts"]
+
+    # SICP stops at the first hop in which nobody gets infected, even if the
+    # infected nodes could still infect somebody later on
+    hist = world["hist"]
+    last = max_hop+1
+    for t in range(1, max_hop+1):
+        if hist[t]==0:
+            last = t
+            break
+    return sum(hist[:last]), sum(world["attempts"][:last])
+
+def delta_monte_carlo_max_hop_simulation(hypergraph: hgx.Hypergraph,
+                                         degree_dict:Dict[int,int],
+                                         neighbor_dict:Dict[int,List[int]],
+                                         incident_hyperedge_dict:Dict[int,List[Tuple[int]]],
+                                         a: Set[int],
+                                         t: float,
+                                         p_min:float,
+                                         p_max:float,
+                                         no_simulations: int,
+                                         max_hop:int,
+                                         model: str,
+                                         crn_seed: int,
+                                         parent: Optional[Set[int]]=None,
+                                         parent_state=None):
+    """
+    Monte Carlo estimate of the influence of seed set a on common random
+    numbers. If the simulation state of a parent seed set is given, only the
+    effects of the seeds added or removed with respect to the parent are
+    simulated.
+
+    Parameters
+    ----------
+    a : set[int]
+        the set of initial active nodes
+    crn_seed : int
+        seed of the random worlds shared by all the evaluated seed sets
+    parent : set[int]
+        seed set whose simulation state is parent_state
+    parent_state
+        simulation state returned when evaluating parent, it is not modified
+
+    Returns
+    -------
+        tuple[float, float, int, state]
+        mean and standard deviation of the number of activated nodes, total
+        number of activation attempts and simulation state of seed set a
+    """
+    if model not in ["WC", "LT", "SICP"]:
+        print(f"Invalid propagation model.")
+        exit(-1)
+
+    no_worlds = 1 if model=="LT" else no_simulations    # LT is deterministic
+    ctx = {"model": model,
+           "max_hop": max_hop,
+           "degree_dict": degree_dict,
+           "neighbor_dict": neighbor_dict,
+           "incident_hyperedge_dict": incident_hyperedge_dict,
+           "threshold": t,
+           "p_min": p_min,
+           "p_max": p_max,
+           "quota": dict()}
+
+    if parent_state is None:
+        state = [_simulate(ctx, ws, set(a)) for ws in world_seeds(crn_seed, no_worlds)]
+    else:
+        state = copy_state(parent_state)
+        removed, added = set(parent)-set(a), set(a)-set(parent)
+        if removed or added:
+            for ws, world in zip(world_seeds(crn_seed, no_worlds), state):
+                _repair(ctx, ws, world, removed, added)
+
+    results = []
+    times = []
+    for world in state:
+        res, time = _world_outcome(model, world, max_hop)
+        results.append(res)
+        times.append(time)
+
+    return (np.mean(results), np.std(results), sum(times), state)
+
+def closest_parent(cache, a: frozenset, max_distance: int) -> Optional[frozenset]:
+    """
+    Among the seed sets whose simulation state is cached, return the one which
+    differs from a by the smallest number of added or removed seeds, provided
+    that it does not exceed max_distance.
+    """
+    best, best_distance = None, max_distance+1
+    for p in cache.keys():
+        if abs(len(p)-len(a)) >= best_distance:
+            continue
+        distance = len(p ^ a)
+        if distance < best_distance:
+            best, best_distance = p, distance
+            if distance == 0:
+                break
+    return best
@@ -0,0 +1,138 @@
+import os
+import time
+import pickle
+
+def save_checkpoint(file_path: str, checkpoint):
+    """
+    Atomically store the checkpoint: it is written to a temporary file which
+    then replaces the previous checkpoint, so that a run killed while saving
+    still finds the previous one.
+    """
+    tmp_file_path = file_path + ".tmp"
+    output_file = open(tmp_file_path, "wb")
+    pickle.dump(checkpoint, output_file, protocol=pickle.HIGHEST_PROTOCOL)
+    output_file.flush()
+    os.fsync(output_file.fileno())
+    output_file.close()
+    os.replace(tmp_file_path, file_path)
+
+def load_checkpoint(file_path: str):
+    """
+    Load the checkpoint stored by checkpoint_observer, None if there is none.
+    """
+    if file_path is None or not os.path.exists(file_path):
+        return None
+    input_file = open(file_path, "rb")
+    checkpoint = pickle.load(input_file)
+    input_file.close()
+    return checkpoint
+
+def stream_file_paths(args):
+    """
+    Files streamed during the evolutionary process.
+    """
+    file_paths = [args["activation_attempts_file_path"], args["hypervolume_file_path"]]
+    if args["generations_file_path"] is not None:
+        file_paths.append(args["generations_file_path"])
+    if args["timing_file_path"] is not None:
+        file_paths.append(args["timing_file_path"])
+    if args["kernel_counters_file_path"] is not None:
+        file_paths.append(args["kernel_counters_file_path"])
+    if args["surrogate_file_path"] is not None:
+        file_paths.append(args["surrogate_file_path"])
+    return file_paths
+
+def resumed_fitness(candidates, args):
+    """
+    Fitness of the initial population of a resumed run, i.e. of the population
+    stored in the checkpoint, so that it does not need to be evaluated again.
+    """
+    checkpoint = args["resume_checkpoint"]
+    return [ind.fitness for ind in checkpoint["population"]]
+
+def checkpoint_observer(population, num_generations, num_evaluations, args):
+    """
+    Store the evolutionary state every checkpoint_interval generations in the
+    checkpoint file (the state at the end of the run is stored by
+    save_final_checkpoint).
+
+    When the run is resumed, the first call restores the state which is not
+    given back to inspyred with the initial population: archive, generation and
+    evaluation counters, files written by the observers, delta evaluation
+    cache, pseudo-random number generator and wall-clock time left before the
+    deadline. It has to be the last
+    observer, since the previous ones observe the initial population of the
+    resumed run as if it were a new one.
+    """
+    ec = args["_ec"]
+    checkpoint = args["resume_checkpoint"]
+    if checkpoint is not None:
+        ec.archive = checkpoint["archive"]
+        ec.num_generations = checkpoint["num_generations"]
+        ec.num_evaluations = checkpoint["num_evaluations"]
+        # drop the rows written after the checkpoint
+        for file_path, size in checkpoint["stream_sizes"].items():
+            os.truncate(file_path, size)
+        args["delta_cache"].clear()
+        args["delta_cache"].update(checkpoint["delta_cache"])
+        args["recent_hypervolumes"].clear()
+        args["recent_hypervolumes"].extend(checkpoint["recent_hypervolumes"])
+        args["total_activation_attempts"] = checkpoint["total_activation_attempts"]
+        args["total_simulations"] = checkpoint["total_simulations"]
+        args["no_simulations"] = checkpoint["no_simulations"]
+        args["fidelity_generation"] = checkpoint["fidelity_generation"]
+        args["fidelity_hypervolume"] = checkpoint["fidelity_hypervolume"]
+        args["timing_num_evaluations"] = checkpoint["num_evaluations"]
+        args["timing_total_simulations"] = checkpoint["total_simulations"]
+        args["surrogate"] = checkpoint["surrogate"]
+        args["sample_estimates"] = checkpoint["sample_estimates"]
+        args["crn_seed"] = checkpoint["crn_seed"]
+        args["random_generator"].setstate(checkpoint["random_state"])
+        # the time spent before the interruption counts against max_seconds
+        if args["deadline"] is not None and checkpoint["remaining_seconds"] is not None:
+            args["deadline"] = time.time() + checkpoint["remaining_seconds"]
+        args["resume_checkpoint"] = None
+        print(f"resumed from checkpoint at generation {ec.num_generations}")
+        return
+
+    if args["checkpoint_file_path"] is None or args["checkpoint_interval"] <= 0:
+        return
+    if num_generations % args["checkpoint_interval"] != 0:
+        return
+
+    save_checkpoint(args["checkpoint_file_path"], evolution_state(ec, num_generations, num_evaluations))
+
+def save_final_checkpoint(ec):
+    """
+    Store the evolutionary state at the end of the run, whatever the terminator
+    which stopped it, so that the pseudo-random number generator can be
+    brought to its final state when the run is skipped by a resumed execution.
+    """
+    args = ec._kwargs
+    if args["checkpoint_file_path"] is not None:
+        save_checkpoint(args["checkpoint_file_path"], evolution_state(ec, ec.num_generations, ec.num_evaluations))
+
+def evolution_state(ec, num_generations, num_evaluations):
+    """
+    Evolutionary state stored in the checkpoint.
+    """
+    args = ec._kwargs
+    return {
+        "population": list(ec.population),
+        "archive": list(ec.archive),
+        "num_generations": num_generations,
+        "num_evaluations": num_evaluations,
+        "stream_sizes": {file_path: os.path.getsize(file_path) for file_path in stream_file_paths(args)},
+        "delta_cache": args["delta_cache"],
+        "crn_seed": args["crn_seed"],
+        "recent_hypervolumes": list(args["recent_hypervolumes"]),
+        "total_activation_attempts": args["total_activation_attempts"],
+        "total_simulations": args["total_simulations"],
+        "no_simulations": args["no_simulations"],
+        "fidelity_generation": args["fidelity_generation"],
+        "fidelity_hypervolume": args["fidelity_hypervolume"],
+        "surrogate": args["surrogate"],
+        "sample_estimates": args["sample_estimates"],
+        "remaining_seconds": args["deadline"] - time.time() if args["deadline"] is not None else None,
+        "random_state": args["random_generator"].getstate()
+    }
@@ -1,9 +1,10 @@
 import inspyred
-from ea.mutation import ea_global_random_mutation
+from ea.mutation import ea_global_random_mutation, ea_bitset_global_random_mutation
+from bitset import bitset_size, drop_lowest_bits
 
 @inspyred.ec.variators.crossover
 def ea_crossover(random, candidate1, candidate2, args):
-    common = list(set(candidate1).intersection(set(candidate2)))                # see common elements
+    common = set(candidate1).intersection(candidate2)                          # see common elements
     max_trials = 5
 
     # apply mutation while the different genes are less than 2 for max_trials times
@@ -17,27 +18,17 @@ def ea_crossover(random, candidate1, candidate2, args):
                 candidate2 = ea_global_random_mutation(random, [candidate2], args)[0]
 
         max_trials -= 1
-        common = list(set(candidate1).intersection(set(candidate2)))
+        common = set(candidate1).intersection(candidate2)
 
     if max_trials==0:
         return [candidate2, candidate1]
 
-    # make a copy of the candidates
-    new_candidate1 = candidate1.copy()
-    new_candidate2 = candidate2.copy()
-    c1_common = {}
-    c2_common = {}
-
-    # remove all the genes in common from each candidate
-    for c in common:
-        new_candidate1.pop(new_candidate1.index(c))
-        new_candidate2.pop(new_candidate2.index(c))
-
-        # save the indexes of the common genes
-        idx1 = candidate1.index(c)
-        idx2 = candidate2.index(c)
-        c1_common[idx1] = c
-        c2_common[idx2] = c
+    # split each candidate into the genes in common, with their indexes, and
+    # the other genes, in a single pass
+    new_candidate1 = [c for c in candidate1 if c not in common]
+    new_candidate2 = [c for c in candidate2 if c not in common]
+    c1_common = [(idx, c) for idx, c in enumerate(candidate1) if c in common]
+    c2_common = [(idx, c) for idx, c in enumerate(candidate2) if c in common]
 
     # choose a swap point
     # if candidates have different lengths it works anyway
@@ -46,10 +37,63 @@ def ea_crossover(random, candidate1, candidate2, args):
     new_candidate1[swap_idx:] = new_candidate2[swap_idx:]
     new_candidate2[swap_idx:] = swap
 
-    # reinsert the common genes 
-    for (idx, c) in c1_common.items():
-        new_candidate1.insert(idx, c) 
-    for (idx, c) in c2_common.items():
-        new_candidate2.insert(idx, c)
+    # reinsert the common genes at their indexes
+    return [reinsert_genes(new_candidate1, c1_common), reinsert_genes(new_candidate2, c2_common)]
+
+def reinsert_genes(genes, indexed_genes):
+    """
+    Merge the (index, gene) pairs, sorted by index, into the list of genes so
+    that each gene gets back its index (or is appended, if the list is too
+    short), in a single pass instead of one list.insert per gene.
+    """
+    merged = list()
+    i = 0
+    for (idx, c) in indexed_genes:
+        while len(merged) < idx and i < len(genes):
+            merged.append(genes[i])
+            i += 1
+        merged.append(c)
+    merged.extend(genes[i:])
+    return merged
+
+@inspyred.ec.variators.crossover
+def ea_bitset_crossover(random, candidate1, candidate2, args):
+    """
+    ea_crossover on bitset genomes (see bitset.py): the genes which are not in
+    common are ordered by node, and their tails after a random swap point are
+    exchanged. Each step is a word-parallel operation on the bitsets instead of
+    a scan of the lists.
+    """
+    common = candidate1 & candidate2                                            # see common elements
+    max_trials = 5
+
+    # apply mutation while the different genes are less than 2 for max_trials times
+    while bitset_size(candidate1 & ~common) < 2 and max_trials > 0:
+        if bitset_size(candidate1 & ~common) == 1:                              # if the two candidates differ by 1 element, perform a random mutation once
+            candidate1 = ea_bitset_global_random_mutation(random, [candidate1], args)[0]
+            candidate2 = ea_bitset_global_random_mutation(random, [candidate2], args)[0]
+        elif candidate1 == common:                                              # if the two candidates are identical, perform a random mutation twice
+            for _ in range(2):
+                candidate1 = ea_bitset_global_random_mutation(random, [candidate1], args)[0]
+                candidate2 = ea_bitset_global_random_mutation(random, [candidate2], args)[0]
+
+        max_trials -= 1
+        common = candidate1 & candidate2
+
+    if max_trials==0:
+        return [candidate2, candidate1]
+
+    # genes of each candidate which are not in common
+    different1 = candidate1 & ~common
+    different2 = candidate2 & ~common
+
+    # choose a swap point, and swap the different genes from it on
+    # if candidates have different lengths it works anyway
+    swap_idx = random.randint(1, bitset_size(different1) - 1) # if swap_idx = 0, all the genes are swapped, so no crossover is done
+    swap1 = drop_lowest_bits(different1, swap_idx)
+    swap2 = drop_lowest_bits(different2, swap_idx)
+
+    new_candidate1 = common | (different1 ^ swap1) | swap2
+    new_candidate2 = common | (different2 ^ swap2) | swap1
 
-    return [new_candidate1, new_candidate2] 
+    return [new_candidate1, new_candidate2]
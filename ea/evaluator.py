@@ -1,8 +1,259 @@
 import inspyred
+from functools import partial
 from tqdm import tqdm
 from joblib import Parallel, delayed
+from delta_evaluation import delta_monte_carlo_max_hop_simulation, closest_parent
+from ea.checkpoint import resumed_fitness
+from ea.observer import append_csv_row
+from monte_carlo_max_hop import new_counters
+from surrogate import screen_offspring, surrogate_features, add_samples
+from bitset import bitset_nodes
+from remote_evaluation import remote_evaluate
+from ea.archiver import ea_archiver
+from fitness_store import lookup_estimates, store_estimates, merge_estimates, model_setting
+
+def fitness_with_counters(fitness_function, **kwargs):
+    """
+    Run fitness_function with new kernel counters and return them together with
+    its outputs, since the counters updated in a worker process are not shared
+    with the main one.
+    """
+    counters = new_counters()
+    return tuple(fitness_function(counters=counters, **kwargs)) + (counters,)
+
+def seed_set(candidate, args):
+    """
+    Seeds of a candidate, whatever its genome representation (list of nodes or
+    bitset, see bitset.py).
+    """
+    if not args["bitset_genome"]:
+        return candidate
+    return bitset_nodes(candidate, args["nodes"])
+
+def canonical_seed_set(candidate, args):
+    """
+    Hashable key of the seed set of a candidate, equal for all the candidates
+    with the same seeds: the bitset itself or the frozenset of the list.
+    """
+    if args["bitset_genome"]:
+        return candidate
+    return frozenset(candidate)
 
 def ea_evaluator(candidates, args):
+    if args["resume_checkpoint"] is not None:
+        # the initial population of a resumed run has already been evaluated
+        return resumed_fitness(candidates, args)
+
+    accumulate = args["sample_estimates"] is not None
+
+    if not args["deduplication"]:
+        # the propagation models are seeded with the nodes of the candidates
+        fitness, time_gen = screened_evaluator([seed_set(a, args) for a in candidates], args)
+        if accumulate:
+            refresh_fitness(dict(zip([canonical_seed_set(a, args) for a in candidates], fitness)), args)
+        args["time"].append(time_gen)
+        return fitness
+
+    # the offspring identical to a member of the population get its fitness,
+    # unless it is approximate or, with a multi-fidelity schedule, it may have
+    # been evaluated with fewer simulations; with sample accumulation they are
+    # simulated again to refine the estimate of their spread
+    known = dict()
+    if args["fidelity"] == "fixed" and not accumulate:
+        for ind in args["_ec"].population:
+            if not getattr(ind.fitness, "approximate", False):
+                known[canonical_seed_set(ind.candidate, args)] = ind.fitness
+
+    # the other ones are evaluated once per distinct seed set
+    keys = [canonical_seed_set(a, args) for a in candidates]
+    unique = dict()
+    for key, a in zip(keys, candidates):
+        if key not in known and key not in unique:
+            unique[key] = seed_set(a, args)
+    unique_fitness, unique_time = screened_evaluator(list(unique.values()), args)
+
+    # fan the fitness out to the duplicates, whose Time (Activation Attempts)
+    # is 0 since they are not simulated
+    unique_time = dict(zip(unique, unique_time))
+    known.update(zip(unique, unique_fitness))
+    fitness = [known[key] for key in keys]
+    time_gen = [unique_time.pop(key, 0) for key in keys]
+
+    if accumulate:
+        refresh_fitness(dict(zip(unique, unique_fitness)), args)
+
+    args["duplicate_rate"] = (len(candidates) - len(unique)) / len(candidates)
+    args["time"].append(time_gen)
+    return fitness
+
+def refresh_fitness(fitness, args):
+    """
+    Give the members of the population and of the archive the fitness of their
+    seed set, if it has just been evaluated again with sample accumulation,
+    and drop the members of the archive which are dominated after the update.
+
+    Parameters
+    ----------
+    fitness : dict
+        fitness of each canonical seed set evaluated
+    """
+    fitness = {key: fit for key, fit in fitness.items() if not getattr(fit, "approximate", False)}
+    ec = args["_ec"]
+    for ind in ec.population:
+        key = canonical_seed_set(ind.candidate, args)
+        if key in fitness:
+            ind.fitness = fitness[key]
+    updated = False
+    for ind in ec.archive:
+        key = canonical_seed_set(ind.candidate, args)
+        if key in fitness and ind.fitness != fitness[key]:
+            ind.fitness = fitness[key]
+            updated = True
+    if updated:
+        ec.archive = ea_archiver(random=ec._random, population=list(ec.archive), archive=[], args=args)
+
+def screened_evaluator(candidates, args):
+    """
+    Evaluate the seed sets by Monte Carlo simulation, except the ones screened
+    out by the surrogate, if any, which get the approximate fitness.
+
+    Returns
+    -------
+        the fitness and the Time (Activation Attempts) of each seed set.
+    """
+    if args["surrogate"] is None or not candidates:
+        return stored_evaluator(candidates, args)
+
+    # the candidates which are dominated by the archive even with an optimistic
+    # surrogate estimate of their spread are not simulated
+    simulate, approximate = screen_offspring(candidates, args)
+    simulated_fitness, simulated_time = stored_evaluator([candidates[index] for index in simulate], args)
+
+    fitness = [None]*len(candidates)
+    time_gen = [0]*len(candidates)
+    for index, fit in approximate.items():
+        fitness[index] = fit
+    for i, index in enumerate(simulate):
+        fitness[index] = simulated_fitness[i]
+        time_gen[index] = simulated_time[i]
+
+    # the surrogate is fitted to the spread of the simulated seed sets
+    num_nodes = len(args["nodes"])
+    add_samples(args["surrogate"],
+                [surrogate_features(set(candidates[index]), args) for index in simulate],
+                [fit[0]*num_nodes for fit in simulated_fitness])
+
+    if args["surrogate_file_path"] is not None:
+        ec = args["_ec"]
+        generation = ec.num_generations+1 if ec.population else 0
+        append_csv_row(args["surrogate_file_path"], [generation, len(candidates), len(simulate), 1-len(simulate)/len(candidates),
+                                                     len(args["surrogate"]["targets"]), args["surrogate"]["residual_std"]])
+
+    return fitness, time_gen
+
+def spread_fitness(influence_mean, a, args):
+    """
+    Fitness of the seed set a with the given mean spread.
+    """
+    max_seed_nodes = args["max_seed_nodes"]
+    return inspyred.ec.emo.Pareto([(influence_mean / len(args["nodes"])), ((max_seed_nodes+1-len(set(a)))/max_seed_nodes)])
+
+def stored_evaluator(candidates, args):
+    """
+    Evaluate the seed sets by Monte Carlo simulation, pooling the new
+    simulations with the previous estimate of their spread, kept in the
+    fitness store (see fitness_store.py) or, with sample accumulation, in
+    args["sample_estimates"]:
+    - a seed set without estimate is simulated no_simulations times;
+    - a seed set whose estimate has fewer than no_simulations simulations is
+    simulated no_simulations times again (with sample accumulation, only the
+    missing ones, but at least top_up_simulations);
+    - a seed set whose estimate has no_simulations simulations is not
+    simulated again (with sample accumulation, it is simulated
+    top_up_simulations more times).
+    The fitness is the one of the pooled estimate.
+
+    Returns
+    -------
+        the fitness and the Time (Activation Attempts) of each seed set, 0 for
+        the ones which are not simulated.
+    """
+    store = args["fitness_store"]
+    accumulated = args["sample_estimates"]
+    if (store is None and accumulated is None) or not candidates:
+        fitness, time_gen, _ = simulation_evaluator(candidates, args)
+        return fitness, time_gen
+
+    # LT is deterministic, hence it is simulated only once; the worlds of
+    # delta evaluation are the same at every evaluation (the first
+    # no_simulations ones), hence new simulations are not independent of the
+    # previous ones: there are no top-ups and the new estimate, which covers
+    # the worlds of the previous one, replaces it instead of being merged
+    lt = args["propagation_model"] == "LT"
+    replace = args["delta_evaluation"]
+    no_simulations = 1 if lt else args["no_simulations"]
+    top_up = args["top_up_simulations"] if accumulated is not None and not lt and not replace else 0
+    # read at every call, a resumed run restores the seed of the random worlds
+    setting = model_setting(args["propagation_model"], args["max_hop"], args["threshold"], args["p_min"], args["p_max"], args["crn_seed"])
+    if store is not None:
+        estimates = lookup_estimates(store, setting, candidates)
+    else:
+        estimates = [accumulated.get(frozenset(a)) for a in candidates]
+
+    # the seed sets are simulated in batches of the same number of simulations
+    batches = dict()                                                            # number of simulations -> indexes of the seed sets
+    for index, estimate in enumerate(estimates):
+        if estimate is None:
+            size = no_simulations
+        elif estimate[0] < no_simulations:
+            size = max(no_simulations - estimate[0], top_up) if top_up > 0 else no_simulations
+        else:
+            size = top_up
+        if size > 0:
+            batches.setdefault(size, []).append(index)
+
+    time_gen = [0]*len(candidates)
+    new_estimates = dict()
+    full_simulations = args["no_simulations"]
+    try:
+        for size, indexes in batches.items():
+            if not lt:
+                args["no_simulations"] = size
+            _, batch_time, batch_spread = simulation_evaluator([candidates[index] for index in indexes], args)
+            for index, time, (mean, std) in zip(indexes, batch_time, batch_spread):
+                new_estimates[index] = (size, mean, size*std*std, time)
+                time_gen[index] = time
+    finally:
+        args["no_simulations"] = full_simulations
+
+    simulate = sorted(new_estimates)
+    if store is not None:
+        store["hits"] += len(candidates) - len(simulate)
+        merged = store_estimates(store, setting, [candidates[index] for index in simulate], [new_estimates[index] for index in simulate], replace)
+    else:
+        merged = list()
+        for index in simulate:
+            key = frozenset(candidates[index])
+            estimate = new_estimates[index]
+            if key in accumulated and not replace:
+                estimate = merge_estimates(accumulated[key], estimate)
+            accumulated[key] = estimate
+            merged.append(estimate)
+    for index, estimate in zip(simulate, merged):
+        estimates[index] = estimate
+
+    fitness = [spread_fitness(estimate[1], a, args) for estimate, a in zip(estimates, candidates)]
+    return fitness, time_gen
+
+def simulation_evaluator(candidates, args):
+    """
+    Evaluate the candidates by Monte Carlo simulation.
+
+    Returns
+    -------
+        the fitness, the Time (Activation Attempts) and the (mean, std) of the
+        spread of each candidate.
+    """
     hypergraph = args["hypergraph"]
     degree_dict = args["degree_dict"]
     hyperdegree_dict = args["hyperdegree_dict"]
@@ -18,13 +269,72 @@ def ea_evaluator(candidates, args):
     fitness_function = args["fitness_function"]
     max_seed_nodes = args["max_seed_nodes"]
     n_threads = args["n_threads"]
+    kernel_counters = args["kernel_counters_file_path"] is not None
+    num_nodes = len(args["nodes"])
+
+    # LT is deterministic, hence it is simulated only once
+    args["total_simulations"] += len(candidates) * (1 if model == "LT" else no_simulations)
 
     fitness = [None]*len(candidates)
     time_gen = [None]*len(candidates) # calculate Time (Activation Attempts) for every individual in the population 
+    spread = [None]*len(candidates)   # (mean, std) of the simulated spread of every individual
+
+    if args["delta_evaluation"]:
+        # the simulation state of the evaluated seed sets is kept in the main
+        # process, hence delta evaluation does not use n_threads
+        delta_cache = args["delta_cache"]
+
+        # only the states of the current population are worth keeping, since
+        # the offspring are generated from it
+        population = {frozenset(seed_set(ind.candidate, args)) for ind in args["_ec"].population}
+        for key in [key for key in delta_cache if key not in population]:
+            del delta_cache[key]
+
+        for index, a in tqdm(enumerate(candidates), total=len(candidates), desc=f"Processing delta"):
+            a_set = frozenset(a)
 
-    if n_threads == 1:
+            # offspring close to an evaluated seed set only simulate the effects
+            # of the added or removed seeds
+            parent = closest_parent(delta_cache, a_set, args["delta_max_distance"])
+            influence_mean, influence_std, time, state = delta_monte_carlo_max_hop_simulation(
+                hypergraph=hypergraph,
+                degree_dict=degree_dict,
+                neighbor_dict=neighbor_dict,
+                incident_hyperedge_dict=incident_hyperedge_dict,
+                a=a_set,
+                t=threshold,
+                p_min=p_min,
+                p_max=p_max,
+                no_simulations=no_simulations,
+                max_hop=max_hop,
+                model=model,
+                crn_seed=args["crn_seed"],
+                parent=parent,
+                parent_state=delta_cache[parent] if parent is not None else None
+            )
+
+            delta_cache[a_set] = state
+
+            fitness[index] = inspyred.ec.emo.Pareto([(influence_mean / num_nodes), ((max_seed_nodes+1-len(a_set))/max_seed_nodes)])
+            time_gen[index] = time
+            spread[index] = (influence_mean, influence_std)
+    elif args["remote_pool"] is not None:
+        # each seed set gets its own seed, so that its result does not depend on
+        # the worker evaluating it
+        seeds = [random_generator.getrandbits(64) for _ in candidates]
+        settings = {"threshold": threshold, "p_min": p_min, "p_max": p_max, "no_simulations": no_simulations, "max_hop": max_hop, "model": model}
+        outputs = remote_evaluate(args["remote_pool"], [list(a) for a in candidates], seeds, settings)
+
+        for index, a in enumerate(candidates):
+            a_set = set(a)
+            influence_mean, influence_std, time = outputs[index]
+            fitness[index] = inspyred.ec.emo.Pareto([(influence_mean / num_nodes), ((max_seed_nodes+1-len(a_set))/max_seed_nodes)])
+            time_gen[index] = time
+            spread[index] = (influence_mean, influence_std)
+    elif n_threads == 1:
         for index, a in tqdm(enumerate(candidates), total=len(candidates), desc=f"Processing"):
             a_set = set(a)
+            counters = new_counters() if kernel_counters else None
             influence_mean, influence_std, time = fitness_function(
                 hypergraph=hypergraph,
                 degree_dict=degree_dict,
@@ -37,10 +347,14 @@ def ea_evaluator(candidates, args):
                 no_simulations=no_simulations,
                 max_hop=max_hop,
                 model=model,
-                random_generator=random_generator
+                random_generator=random_generator,
+                counters=counters
             )
-            fitness[index] = inspyred.ec.emo.Pareto([(influence_mean / len(hypergraph.get_nodes())), ((max_seed_nodes+1-len(a_set))/max_seed_nodes)])
+            fitness[index] = inspyred.ec.emo.Pareto([(influence_mean / num_nodes), ((max_seed_nodes+1-len(a_set))/max_seed_nodes)])
             time_gen[index] = time
+            spread[index] = (influence_mean, influence_std)
+            if kernel_counters:
+                args["kernel_counters"].append((len(a_set), counters))
     else:
         # populate the following list with the initial seed set of each
         # candidate in the population
@@ -48,7 +362,7 @@ def ea_evaluator(candidates, args):
         
         # process the candidates in parallel
         outputs = Parallel(n_threads)(
-            delayed(fitness_function)
+            delayed(partial(fitness_with_counters, fitness_function) if kernel_counters else fitness_function)
             (
             hypergraph=hypergraph,
             degree_dict=degree_dict,
@@ -68,9 +382,11 @@ def ea_evaluator(candidates, args):
         # read multi-process outputs
         for index, a in tqdm(enumerate(candidates), total=len(candidates), desc=f"Processing thread solutions"):
             a_set = set(a)
-            influence_mean, influence_std, time = outputs[index]
-            fitness[index] = inspyred.ec.emo.Pareto([(influence_mean / len(hypergraph.get_nodes())), ((max_seed_nodes+1-len(a_set))/max_seed_nodes)])
+            influence_mean, influence_std, time = outputs[index][:3]
+            fitness[index] = inspyred.ec.emo.Pareto([(influence_mean / num_nodes), ((max_seed_nodes+1-len(a_set))/max_seed_nodes)])
             time_gen[index] = time
+            spread[index] = (influence_mean, influence_std)
+            if kernel_counters:
+                args["kernel_counters"].append((len(a_set), outputs[index][3]))
 
-    args["time"].append(time_gen)
-    return fitness
\ No newline at end of file
+    return fitness, time_gen, spread
\ No newline at end of file
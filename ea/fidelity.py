@@ -0,0 +1,52 @@
+import inspyred
+from ea.evaluator import stored_evaluator, seed_set
+from ea.archiver import ea_archiver
+
+def fidelity_observer(population, num_generations, num_evaluations, args):
+    """
+    Raise the number of Monte Carlo simulations per candidate (the fidelity of
+    the evaluation) after the generation, doubling it up to full_simulations.
+
+    schedule : the fidelity is doubled every fidelity_interval generations
+    stagnation : the fidelity is doubled when the HV improved less than
+        fidelity_epsilon over the last fidelity_interval generations
+
+    It has to follow hypervolume_observer, whose HV it reads.
+    """
+    if args["resume_checkpoint"] is not None:
+        # the fidelity of a resumed run is restored by checkpoint_observer
+        return
+    if args["no_simulations"] >= args["full_simulations"]:
+        return
+
+    if num_generations - args["fidelity_generation"] < args["fidelity_interval"]:
+        return
+
+    hv = args["hypervolume"][-1]
+
+    if args["fidelity"] == "schedule" or hv - args["fidelity_hypervolume"] < args["fidelity_epsilon"]:
+        args["no_simulations"] = min(2*args["no_simulations"], args["full_simulations"])
+        # the simulation states of delta evaluation have one world per simulation
+        args["delta_cache"].clear()
+        print(f"fidelity raised to {args['no_simulations']} simulations at generation {num_generations}")
+    args["fidelity_generation"] = num_generations
+    args["fidelity_hypervolume"] = hv
+
+def reevaluate_archive(ec):
+    """
+    Evaluate the members of the Pareto archive again with full_simulations
+    simulations (reusing the estimates of the fitness store, if any), and
+    return the non-dominated ones according to the new fitness.
+    """
+    args = ec._kwargs
+    args["no_simulations"] = args["full_simulations"]
+    args["delta_cache"].clear()
+
+    candidates = [ind.candidate for ind in ec.archive]
+    fitness, _ = stored_evaluator([seed_set(a, args) for a in candidates], args)
+    individuals = list()
+    for candidate, fit in zip(candidates, fitness):
+        ind = inspyred.ec.Individual(candidate, maximize=ec.maximize)
+        ind.fitness = fit
+        individuals.append(ind)
+    return ea_archiver(random=ec._random, population=individuals, archive=[], args=args)
@@ -1,4 +1,5 @@
 import inspyred
+from bitset import to_bitset
 @inspyred.ec.generators.diversify # decorator that makes it impossible to generate copies
 def ea_generator(random, args):
     min_seed_nodes = args["min_seed_nodes"] # min seed set size
@@ -12,4 +13,11 @@ def ea_generator(random, args):
     for i in range(0, individual_size):
         individual[i] = nodes[random.randint(0,len(nodes)-1)]
 
-    return list(set(individual))
\ No newline at end of file
+    return list(set(individual))
+
+@inspyred.ec.generators.diversify # decorator that makes it impossible to generate copies
+def ea_bitset_generator(random, args):
+    """
+    ea_generator for bitset genomes (see bitset.py).
+    """
+    return to_bitset(ea_generator.generator(random, args), args["node_index"])
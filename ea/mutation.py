@@ -1,6 +1,7 @@
 import inspyred
 import numpy as np
 import random
+from bitset import bitset_size, bitset_nodes, to_bitset, random_set_bit, random_unset_bit
 
 @inspyred.ec.variators.mutator
 def ea_mutation(rng, candidate, args):
@@ -33,21 +34,35 @@ def ea_mutation(rng, candidate, args):
         return -1
 
 # === STOCHASTIC OPERATORS =====================================================
+def random_other_node(rng, candidate, args):
+    """
+    Node chosen uniformly at random among the nodes which are not in the
+    candidate. It draws the same node as nodes[rng.randint(0, len(nodes)-1)]
+    on a copy of args["nodes"] without the nodes of the candidate, but in
+    O(k log k) instead of copying and scanning the list of the nodes.
+    """
+    nodes = args["nodes"]
+    excluded = sorted(args["node_index"][c] for c in set(candidate))
+
+    # the r-th node which is not in the candidate is shifted by one position for
+    # each node of the candidate which precedes it
+    r = rng.randint(0, len(nodes) - len(excluded) - 1)
+    for position in excluded:
+        if position > r:
+            break
+        r += 1
+    return nodes[r]
+
 @inspyred.ec.variators.mutator
 def ea_global_random_mutation(rng, candidate, args):
     """
     Randomly mutates one gene of the individual with one random node of the hypergraph.
     """
     if len(candidate)>1:
-        # remove nodes in the candidate solution from the pool of nodes the mutation algorithm samples from
-        nodes = args["nodes"].copy()
-        for c in candidate:
-            if c in nodes: nodes.remove(c)
-
         mutated_candidate = candidate.copy()
 
-        # choose the gene to mutate
-        new_gene = nodes[rng.randint(0, len(nodes) - 1)]
+        # choose the gene to mutate among the nodes which are not in the candidate solution
+        new_gene = random_other_node(rng, candidate, args)
 
         # mutate
         mutation_idx = rng.randint(0, len(mutated_candidate) - 1)
@@ -68,13 +83,8 @@ def ea_insertion_mutation(rng, candidate, args):
     if len(mutated_candidate) >= max_seed_nodes:
         return ea_global_random_mutation(rng, [candidate], args)[0]
     
-    # remove nodes which are in the candidate solution from the pool of nodes
-    # the mutation algorithm samples from
-    nodes = args["nodes"].copy()
-    for c in candidate:
-        if c in nodes: nodes.remove(c)
-    
-    mutated_node = nodes[rng.randint(0, len(nodes)-1)]
+    # sample the node among the ones which are not in the candidate solution
+    mutated_node = random_other_node(rng, candidate, args)
     mutated_candidate.append(mutated_node)
 
     return mutated_candidate
@@ -756,4 +766,72 @@ def ea_global_hyperedge_order_mutation_inverse(rng, candidate, args):
         # if we don't have nodes to choose from, global mutation
         mutated_candidate = ea_global_random_mutation(rng, [candidate], args)[0]
     
-    return mutated_candidate
\ No newline at end of file
+    return mutated_candidate
+
+# === BITSET OPERATORS =========================================================
+# the same operators on bitset genomes (see bitset.py)
+@inspyred.ec.variators.mutator
+def ea_bitset_mutation(rng, candidate, args):
+    """
+    Custom mutation operator on bitset genomes
+    """
+    # if candidate length is equal to one then perform insertion mutation
+    if bitset_size(candidate) == 1:
+        return ea_bitset_insertion_mutation(rng, [candidate], args)[0]
+
+    # stochastic or hypergraph-aware
+    randomChoice = rng.choices([i for i in range(4)], k=1)[0]
+
+    if randomChoice==0:
+        # global random mutation
+        return ea_bitset_global_random_mutation(rng, [candidate], args)[0]
+    if randomChoice==1:
+        # random insertion mutation
+        return ea_bitset_insertion_mutation(rng, [candidate], args)[0]
+    if randomChoice==2:
+        # random removal mutation
+        return ea_bitset_removal_mutation(rng, [candidate], args)[0]
+    elif randomChoice==3:
+        # hypergraph-aware mutation operator, on the list of the seeds
+        gene_selection_strategy = 5
+        node_selection_strategy = rng.choices([2,9], k=1)[0]
+        mutated_candidate = ea_hypergraph_aware_mutation(rng, bitset_nodes(candidate, args["nodes"]), gene_selection=gene_selection_strategy, node_selection=node_selection_strategy, args=args)
+        return to_bitset(mutated_candidate, args["node_index"])
+    else:
+        print("\n\nERROR MUTATION CHOICE\n\n")
+        return -1
+
+@inspyred.ec.variators.mutator
+def ea_bitset_global_random_mutation(rng, candidate, args):
+    """
+    Randomly mutates one gene of the individual with one random node of the hypergraph.
+    """
+    if bitset_size(candidate)>1:
+        # replace a random seed with a random node which is not a seed
+        new_gene = random_unset_bit(rng, candidate, len(args["nodes"]))
+        return (candidate ^ random_set_bit(rng, candidate)) | new_gene
+    else:
+        return candidate
+
+@inspyred.ec.variators.mutator
+def ea_bitset_insertion_mutation(rng, candidate, args):
+    """
+    Randomly add a node to the individual.
+    """
+    # if the length of the candidate is already the maximum then perform global mutation
+    if bitset_size(candidate) >= args["max_seed_nodes"]:
+        return ea_bitset_global_random_mutation(rng, [candidate], args)[0]
+
+    return candidate | random_unset_bit(rng, candidate, len(args["nodes"]))
+
+@inspyred.ec.variators.mutator
+def ea_bitset_removal_mutation(rng, candidate, args):
+    """
+    Randomly remove a node of the individual.
+    """
+    # if the length of the candidate is smaller then or equal to the minimum
+    # seed set size then perform global mutation
+    if bitset_size(candidate) <= args["min_seed_nodes"]:
+        return ea_bitset_global_random_mutation(rng, [candidate], args)[0]
+
+    return candidate ^ random_set_bit(rng, candidate)
@@ -1,8 +1,11 @@
 from typing import Dict, List
-import pandas as pd
+import time
+import json
 import numpy as np
 from pymoo.indicators.hv import Hypervolume
 
+from monte_carlo_max_hop import new_counters, merge_counters
+
 def ea_observer(population, num_generations, num_evaluations, args):
     # current best individual
     best = max(population)
@@ -12,28 +15,76 @@ def ea_observer(population, num_generations, num_evaluations, args):
 
     print(f"OBSERVER\n[num generations:{num_generations}]\n[num evaluations:{num_evaluations}]\n[current best individual:{best}]\n[population size:{population_size}]\n")
 
-def time_observer(population, num_generations, num_evaluations, args):
+def append_csv_row(file_path: str, row: List):
 	"""
-	Save Time (Activation Attempts) at the end of the evolutionary process.
+	Append one row to a CSV file. The file is opened and closed at every row, so
+	that it can be read while the evolutionary process is running and nothing
+	but the current generation is lost if the process dies.
 	"""
+	output_file = open(file_path, "a")
+	output_file.write(",".join(str(x) for x in row) + "\n")
+	output_file.close()
 
-	df = pd.DataFrame(args["time"])
-	df.to_csv(args["activation_attempts_file_path"], index=False, header=None)
-	return
+def init_stream_files(args):
+	"""
+	Create (or empty) the files streamed during the evolutionary process,
+	writing the headers.
+	"""
+	open(args["activation_attempts_file_path"], "w").close()
+	open(args["hypervolume_file_path"], "w").close()
+	append_csv_row(args["hypervolume_file_path"], ["generation", "hv"])
+	if args["generations_file_path"] is not None:
+		open(args["generations_file_path"], "w").close()
+		append_csv_row(args["generations_file_path"], ["generation", "num_evaluations", "hv", "front_size", "activation_attempts", "no_simulations", "duplicate_rate", "seconds"])
+	if args["timing_file_path"] is not None:
+		open(args["timing_file_path"], "w").close()
+	if args["kernel_counters_file_path"] is not None:
+		open(args["kernel_counters_file_path"], "w").close()
+	if args["surrogate_file_path"] is not None:
+		open(args["surrogate_file_path"], "w").close()
+		append_csv_row(args["surrogate_file_path"], ["generation", "offspring", "simulated", "saved_fraction", "samples", "residual_std"])
 
-def hypervolume_observer(population, num_generations, num_evaluations, args):
-    # current best individual
-    best = max(population)
+def stream_observer(population, num_generations, num_evaluations, args):
+	"""
+	Write the Time (Activation Attempts) and the HV of the generation as soon as
+	it is over, together with its number of evaluations, size of the Pareto
+	front, number of simulations per candidate, fraction of the offspring which
+	were duplicates (not simulated, see ea_evaluator) and duration in seconds.
 
-    # population size
-    population_size = len(population)
+	Rows are not accumulated in memory: args["time"] and args["hypervolume"] are
+	emptied once written.
+	"""
+	if args["resume_checkpoint"] is not None:
+		# the initial population of a resumed run has already been written
+		args["time"].clear()
+		args["hypervolume"].clear()
+		args["generation_start_time"] = time.time()
+		return
 
-    # updating the Hypervolume list troughout the evolutionaty process
-    
+	attempts = 0
+	for time_gen in args["time"]:
+		append_csv_row(args["activation_attempts_file_path"], time_gen)
+		attempts += sum(time_gen)
+	args["total_activation_attempts"] += attempts
+	hv = args["hypervolume"][-1]
+	append_csv_row(args["hypervolume_file_path"], [num_generations+1, hv])
+
+	if args["generations_file_path"] is not None:
+		now = time.time()
+		append_csv_row(args["generations_file_path"], [num_generations, num_evaluations, hv, len(args["_ec"].archive), attempts, args["no_simulations"], args["duplicate_rate"], now - args["generation_start_time"]])
+		args["generation_start_time"] = now
+
+	args["time"].clear()
+	args["hypervolume"].clear()
+
+def archive_hypervolume(archive) -> float:
+    """
+    Hypervolume of the Pareto archive.
+    """
     # switch all the obj. functions' value to -(minus) in order to have a
     # minimization problem and compute the Hypervolume correctly respect to the
     # pymoo implementation taken by DEAP
-    arch = [list(x.fitness) for x in args["_ec"].archive] 
+    arch = [list(x.fitness) for x in archive] 
     for i in range(len(arch)):
         for j in range(len(arch[i])):
             if float(arch[i][j])>=0:
@@ -41,7 +92,41 @@ def hypervolume_observer(population, num_generations, num_evaluations, args):
     F =  np.array(arch)
 
     metric = Hypervolume(ref_point=np.array([0,0]),norm_ref_point=False,zero_to_one=False)
-    hv = metric.do(F)
+    return metric.do(F)
+
+def hypervolume_observer(population, num_generations, num_evaluations, args):
+    # current best individual
+    best = max(population)
+
+    # population size
+    population_size = len(population)
+
+    # updating the Hypervolume list troughout the evolutionaty process
+    hv = archive_hypervolume(args["_ec"].archive)
     args["hypervolume"].append(hv)
+    args["recent_hypervolumes"].append(hv)
+
+    print(f"OBSERVER\n[num generations:{num_generations}]\n[num evaluations:{num_evaluations}]\n[current best individual:{best}]\n[population size:{population_size}]\n[hypervolume:{hv}]\n")         
+
+def kernel_counters_observer(population, num_generations, num_evaluations, args):
+	"""
+	Append to the JSON-lines kernel counters file the hot-path counters of the
+	propagation models (see monte_carlo_max_hop.new_counters) of each candidate
+	evaluated in the generation, and their total.
+	"""
+	if args["resume_checkpoint"] is not None:
+		# the initial population of a resumed run has already been written
+		args["kernel_counters"].clear()
+		return
+
+	total = new_counters()
+	candidates = list()
+	for size, counters in args["kernel_counters"]:
+		merge_counters(total, counters)
+		candidates.append(dict(counters, seed_set_size=size))
+	record = {"generation": num_generations, "num_evaluations": num_evaluations, "total": total, "candidates": candidates}
 
-    print(f"OBSERVER\n[num generations:{num_generations}]\n[num evaluations:{num_evaluations}]\n[current best individual:{best}]\n[population size:{population_size}]\n[hypervolume:{hv}]\n")         
\ No newline at end of file
+	output_file = open(args["kernel_counters_file_path"], "a")
+	output_file.write(json.dumps(record) + "\n")
+	output_file.close()
+	args["kernel_counters"].clear()
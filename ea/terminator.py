@@ -1,18 +1,38 @@
-from ea.observer import time_observer
-import pandas as pd
+import time
 
 def generation_termination(population, num_generations, num_evaluations, args):
     """
     Return true when reached the maximum number of generations.
     """
-    if num_generations == args["generations_budget"]:
-        # store hypervolumes
-        x = [x for x in range(1,len(args["hypervolume"])+1)]
-        df = pd.DataFrame()
-        df["generation"] = x
-        df["hv"] = args["hypervolume"]
-        df.to_csv(args["hypervolume_file_path"], sep=",",index=False)
+    return num_generations == args["generations_budget"]
 
-        # store activation attempts
-        time_observer(population, num_generations, num_evaluations, args)
-    return num_generations == args["generations_budget"]
\ No newline at end of file
+def wall_clock_termination(population, num_generations, num_evaluations, args):
+    """
+    Return true when the next generation would not end before the wall-clock
+    deadline, assuming that it lasts as long as the last one.
+    """
+    now = time.time()
+    last_generation_seconds = now - args["last_generation_end_time"]
+    args["last_generation_end_time"] = now
+    return now + last_generation_seconds > args["deadline"]
+
+def budget_termination(population, num_generations, num_evaluations, args):
+    """
+    Return true when the number of Monte Carlo simulations or of activation
+    attempts reached its budget (None for no budget).
+    """
+    if args["simulations_budget"] is not None and args["total_simulations"] >= args["simulations_budget"]:
+        return True
+    if args["activation_attempts_budget"] is not None and args["total_activation_attempts"] >= args["activation_attempts_budget"]:
+        return True
+    return False
+
+def stagnation_termination(population, num_generations, num_evaluations, args):
+    """
+    Return true when the HV improved less than stagnation_epsilon over the last
+    stagnation_generations generations.
+    """
+    recent_hypervolumes = args["recent_hypervolumes"]
+    if len(recent_hypervolumes) < args["stagnation_generations"]+1:
+        return False
+    return recent_hypervolumes[-1] - recent_hypervolumes[0] < args["stagnation_epsilon"]
\ No newline at end of file
@@ -0,0 +1,62 @@
+import time
+import json
+import functools
+
+def timed(phase: str, function):
+    """
+    Wrap an inspyred operator (evaluator, variator, selector, replacer,
+    archiver or observer) so that its wall time is added to
+    args["phase_times"][phase].
+    """
+    @functools.wraps(function)
+    def timed_function(*pargs, **kwargs):
+        start_time = time.perf_counter()
+        result = function(*pargs, **kwargs)
+        phase_times = kwargs["args"]["phase_times"]
+        phase_times[phase] = phase_times.get(phase, 0.0) + time.perf_counter() - start_time
+        return result
+    return timed_function
+
+def timing_observer(population, num_generations, num_evaluations, args):
+    """
+    Append to the JSON-lines timing file the wall time spent by the generation
+    in each phase, together with the evaluation throughput (candidates and
+    Monte Carlo simulations per second). Time not spent in a timed phase is
+    reported as "other".
+    """
+    now = time.perf_counter()
+    if args["resume_checkpoint"] is not None:
+        # the initial population of a resumed run has already been written
+        args["phase_times"].clear()
+        args["timing_start_time"] = now
+        args["timing_num_evaluations"] = num_evaluations
+        args["timing_total_simulations"] = args["total_simulations"]
+        return
+
+    seconds = now - args["timing_start_time"]
+    phase_times = dict(args["phase_times"])
+    phase_times["other"] = seconds - sum(phase_times.values())
+
+    candidates = num_evaluations - args["timing_num_evaluations"]
+    simulations = args["total_simulations"] - args["timing_total_simulations"]
+    evaluation_seconds = phase_times.get("evaluation", 0.0)
+
+    record = {
+        "generation": num_generations,
+        "num_evaluations": num_evaluations,
+        "seconds": seconds,
+        "phases": phase_times,
+        "candidates": candidates,
+        "simulations": simulations,
+        "candidates_per_second": candidates / evaluation_seconds if evaluation_seconds > 0 else None,
+        "simulations_per_second": simulations / evaluation_seconds if evaluation_seconds > 0 else None
+    }
+    output_file = open(args["timing_file_path"], "a")
+    output_file.write(json.dumps(record) + "\n")
+    output_file.close()
+
+    args["phase_times"].clear()
+    args["timing_num_evaluations"] = num_evaluations
+    args["timing_total_simulations"] = args["total_simulations"]
+    # the time spent writing the record is accounted to the next generation
+    args["timing_start_time"] = now
@@ -0,0 +1,200 @@
+from typing import Dict, List, Tuple
+import os
+import csv
+import json
+import random
+import argparse
+import time
+import collections
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+
+from loaders import load_hypergraph
+from monte_carlo_max_hop import monte_carlo_max_hop_simulation
+from spread_service import query_spread
+from remote_evaluation import hypergraph_index
+
+# columns of the results table, the first ones identify a cell
+KEY_COLUMNS = ["file", "index", "k", "model", "max_hop", "threshold", "p_min", "p_max", "no_simulations", "random_seed"]
+VALUE_COLUMNS = ["influence_mean", "influence_std", "influence_fraction", "activation_attempts", "seconds"]
+
+# hypergraph and pre-computed dictionaries, loaded once by the main process
+# before the worker processes are forked, which inherit them instead of
+# receiving them with every cell
+worker_data = dict()
+
+def load_worker_data(hypergraph_path: str):
+    """
+    Load the hypergraph and pre-compute the degree, neighbor list and incident
+    hyperedge list of each node.
+    """
+    worker_data.update(hypergraph_index(load_hypergraph(hypergraph_path)))
+    worker_data["num_nodes"] = len(worker_data["hypergraph"].get_nodes())
+
+def model_settings(models: List[str], max_hops: List[int], thresholds: List[float],
+                   p_mins: List[float], p_maxs: List[float]) -> List[Dict]:
+    """
+    Parameter settings to be evaluated. A parameter which is not used by a model
+    (e.g. the threshold for WC) is left empty, so that the same setting is not
+    evaluated several times.
+    """
+    settings = list()
+    for model in models:
+        for max_hop in max_hops:
+            if model == "WC":
+                settings.append({"model": model, "max_hop": max_hop, "threshold": None, "p_min": None, "p_max": None})
+            elif model == "LT":
+                for threshold in thresholds:
+                    settings.append({"model": model, "max_hop": max_hop, "threshold": threshold, "p_min": None, "p_max": None})
+            elif model == "SICP":
+                for p_min, p_max in zip(p_mins, p_maxs):
+                    settings.append({"model": model, "max_hop": max_hop, "threshold": None, "p_min": p_min, "p_max": p_max})
+    return settings
+
+def cell_key(cell: Dict) -> Tuple[str]:
+    """
+    Key identifying a cell, as read back from the results table.
+    """
+    return tuple("" if cell[c] is None else str(cell[c]) for c in KEY_COLUMNS)
+
+def evaluate_cell(cell: Dict, seed_set: List[int]) -> Dict:
+    """
+    Estimate the influence of one seed set under one parameter setting.
+
+    The pseudo-random number generator is seeded from the cell itself, so the
+    result does not depend on the number of workers nor on the order in which
+    the cells are processed.
+    """
+    rng = random.Random("/".join(cell_key(cell)))
+    start_time = time.time()
+    influence_mean, influence_std, attempts = monte_carlo_max_hop_simulation(
+        hypergraph=worker_data["hypergraph"],
+        degree_dict=worker_data["degree_dict"],
+        neighbor_dict=worker_data["neighbor_dict"],
+        incident_hyperedge_dict=worker_data["incident_hyperedge_dict"],
+        a=set(seed_set),
+        t=cell["threshold"],
+        p_min=cell["p_min"],
+        p_max=cell["p_max"],
+        no_simulations=cell["no_simulations"],
+        max_hop=cell["max_hop"],
+        model=cell["model"],
+        random_generator=rng
+    )
+    row = dict(cell)
+    row["influence_mean"] = float(influence_mean)
+    row["influence_std"] = float(influence_std)
+    row["influence_fraction"] = float(influence_mean)/worker_data["num_nodes"]
+    row["activation_attempts"] = attempts
+    row["seconds"] = time.time() - start_time
+    return row
+
+def evaluate_cells_with_service(url: str, dataset: str, cells: List[Dict], seed_sets: Dict[str,List[List[int]]], batch_size: int):
+    """
+    Estimate the influence of the seed sets of the cells with the spread
+    service at url, one query per batch of cells with the same parameter
+    setting, and yield the rows as soon as each batch is answered.
+    """
+    groups = collections.defaultdict(list)
+    for cell in cells:
+        groups[tuple(cell[c] for c in ["model", "max_hop", "threshold", "p_min", "p_max", "no_simulations", "random_seed"])].append(cell)
+    for group in groups.values():
+        for i in range(0, len(group), batch_size):
+            batch = group[i:i+batch_size]
+            cell = batch[0]
+            start_time = time.time()
+            results = query_spread(url, dataset, [seed_sets[c["file"]][c["index"]] for c in batch], cell["model"], cell["no_simulations"],
+                                   cell["max_hop"], cell["threshold"], cell["p_min"], cell["p_max"], cell["random_seed"])
+            seconds = (time.time() - start_time) / len(batch)
+            for cell, result in zip(batch, results):
+                row = dict(cell)
+                row["influence_mean"] = result["influence_mean"]
+                row["influence_std"] = result["influence_std"]
+                row["influence_fraction"] = result["influence_fraction"]
+                row["activation_attempts"] = result["activation_attempts"]
+                row["seconds"] = seconds
+                yield row
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Evaluate the seed sets of baseline output files under several propagation models.")
+
+    parser.add_argument("--hypergraph_path", type=str, default="dataset/small/small.json", help="File path of the JSON file encoding the input hypergraph network.")
+    parser.add_argument("--input_file_paths", type=str, nargs="+", required=True, help="File paths of the JSON files with a list of seed sets (e.g. hdd.json, high_degree.json, random.json, hci.json, moea.json).")
+    parser.add_argument("--output_file_path", type=str, default="output/baselines_evaluation.csv", help="File path of the CSV results table. Cells already in the table are not evaluated again.")
+
+    parser.add_argument("--models", type=str, nargs="+", default=["WC", "LT", "SICP"], choices=["WC", "LT", "SICP"], help="Influence propagation models.")
+    parser.add_argument("--max_hops", type=int, nargs="+", default=[5], help="Numbers of max hops for the Monte Carlo max hop function.")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.8], help="Thresholds for LT propagation model.")
+    parser.add_argument("--p_mins", type=float, nargs="+", default=[0.005], help="Probabilities MIN for SICP propagation model, paired with --p_maxs.")
+    parser.add_argument("--p_maxs", type=float, nargs="+", default=[0.02], help="Probabilities MAX for SICP propagation model, paired with --p_mins.")
+    parser.add_argument("--no_simulations", type=int, default=100, help="Number of simulations for spread calculation.")
+
+    parser.add_argument("--random_seed", type=int, default=42, help="Seed to initialize the pseudo-random number generation.")
+    parser.add_argument("--n_threads", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--service_url", type=str, default=None, help="URL of a spread service (spread_service.py) to query instead of loading the hypergraph, e.g. http://127.0.0.1:8050. The dataset is the name of the file of --hypergraph_path, and the pseudo-random number generator of a seed set is seeded from the seed set itself rather than from the cell.")
+    parser.add_argument("--service_batch_size", type=int, default=64, help="Number of seed sets of each query to the spread service.")
+
+    args = parser.parse_args()
+    if len(args.p_mins) != len(args.p_maxs):
+        parser.error("--p_mins and --p_maxs must have the same length.")
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+
+    # read the seed sets of the input files
+    seed_sets:Dict[str,List[List[int]]] = dict()
+    for file_path in args["input_file_paths"]:
+        input_file = open(file_path)
+        seed_sets[file_path] = json.load(input_file)
+        input_file.close()
+
+    # cells already in the results table
+    done = set()
+    if os.path.exists(args["output_file_path"]):
+        output_file = open(args["output_file_path"], newline="")
+        for row in csv.DictReader(output_file):
+            done.add(tuple(row[c] for c in KEY_COLUMNS))
+        output_file.close()
+
+    # one cell for each (file, seed set, parameter setting)
+    settings = model_settings(args["models"], args["max_hops"], args["thresholds"], args["p_mins"], args["p_maxs"])
+    cells = list()
+    for file_path, file_seed_sets in seed_sets.items():
+        for index, seed_set in enumerate(file_seed_sets):
+            for setting in settings:
+                cell = {"file": file_path, "index": index, "k": len(seed_set),
+                        "no_simulations": args["no_simulations"], "random_seed": args["random_seed"]}
+                cell.update(setting)
+                if cell_key(cell) not in done:
+                    cells.append(cell)
+    print(f"{len(cells)} cells to evaluate, {len(done)} already in {args['output_file_path']}")
+
+    if cells:
+        output_folder_path = os.path.dirname(args["output_file_path"])
+        if output_folder_path:
+            os.makedirs(output_folder_path, exist_ok=True)
+        write_header = not os.path.exists(args["output_file_path"]) or os.path.getsize(args["output_file_path"]) == 0
+        output_file = open(args["output_file_path"], "a", newline="")
+        writer = csv.DictWriter(output_file, fieldnames=KEY_COLUMNS+VALUE_COLUMNS)
+        if write_header:
+            writer.writeheader()
+
+        # rows are written as soon as they are available, so that an interrupted
+        # execution can be resumed
+        if args["service_url"] is not None:
+            dataset = os.path.splitext(os.path.basename(args["hypergraph_path"]))[0]
+            for row in tqdm(evaluate_cells_with_service(args["service_url"], dataset, cells, seed_sets, args["service_batch_size"]), total=len(cells), desc="Processing cells"):
+                writer.writerow(row)
+                output_file.flush()
+        else:
+            load_worker_data(args["hypergraph_path"])
+            with ProcessPoolExecutor(max_workers=args["n_threads"], mp_context=multiprocessing.get_context("fork")) as executor:
+                futures = [executor.submit(evaluate_cell, cell, seed_sets[cell["file"]][cell["index"]]) for cell in cells]
+                for future in tqdm(as_completed(futures), total=len(futures), desc="Processing cells"):
+                    writer.writerow(future.result())
+                    output_file.flush()
+        output_file.close()
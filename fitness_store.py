@@ -0,0 +1,112 @@
+from typing import Dict, List, Tuple
+import hashlib
+import sqlite3
+import hypergraphx as hgx
+
+# Persistent store of the spread estimates of the seed sets, shared by the
+# runs (and by the processes of a sweep).
+#
+# An estimate is kept as the sufficient statistics of the simulated spreads:
+# number of simulations, mean and sum of the squared deviations from the mean
+# (M2), together with the total activation attempts. The estimates of the
+# simulations of a new run are merged into the stored ones, so that the
+# estimate of a seed set gets more precise every time it is simulated.
+#
+# Estimates are keyed by the hash of the content of the hypergraph (its
+# hyperedges, whatever the file they were read from), the setting of the
+# propagation model (model, max hops, the parameters used by the model and
+# the seed of the common random numbers of delta evaluation, if any) and the
+# canonical seed set (its sorted nodes). The estimates simulated on common
+# random numbers are never merged with independent ones, nor with the ones
+# of other random worlds, so that they stay paired across seed sets.
+
+# (number of simulations, mean, M2, activation attempts)
+Estimate = Tuple[int,float,float,float]
+
+def hypergraph_hash(hypergraph: hgx.Hypergraph) -> str:
+    """
+    SHA-256 of the hyperedges of the hypergraph, as sorted lists of nodes in
+    sorted order.
+    """
+    edges = sorted(sorted(edge) for edge in hypergraph.get_edges())
+    return hashlib.sha256(repr(edges).encode()).hexdigest()
+
+def model_setting(model: str, max_hop: int, threshold: float, p_min: float, p_max: float, crn_seed: int = None) -> str:
+    """
+    Key of the setting of the propagation model, made of the parameters used
+    by the model only, and of the seed of the common random numbers (None for
+    independent simulations). LT is deterministic, hence its key does not
+    depend on the random worlds.
+    """
+    if model == "LT":
+        return f"LT/{max_hop}/{threshold}"
+    crn = f"/crn={crn_seed}" if crn_seed is not None else ""
+    if model == "SICP":
+        return f"SICP/{max_hop}/{p_min}/{p_max}{crn}"
+    return f"{model}/{max_hop}{crn}"
+
+def seed_set_key(a) -> str:
+    return ",".join(str(n) for n in sorted(a))
+
+def merge_estimates(x: Estimate, y: Estimate) -> Estimate:
+    """
+    Estimate of the union of the simulations of x and y (pairwise update of
+    Chan et al. of the mean and M2).
+    """
+    count = x[0] + y[0]
+    if count == 0:
+        return x
+    delta = y[1] - x[1]
+    mean = x[1] + delta * y[0] / count
+    m2 = x[2] + y[2] + delta * delta * x[0] * y[0] / count
+    return (count, mean, m2, x[3] + y[3])
+
+def open_fitness_store(file_path: str, hypergraph: hgx.Hypergraph) -> Dict:
+    """
+    Open (or create) the store in the SQLite file for the hypergraph.
+    """
+    # concurrent runs wait for each other's writes instead of failing
+    connection = sqlite3.connect(file_path, timeout=600.0)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE IF NOT EXISTS estimates (hypergraph TEXT, setting TEXT, seed_set TEXT, "
+                       "count INTEGER, mean REAL, m2 REAL, activation_attempts REAL, PRIMARY KEY (hypergraph, setting, seed_set))")
+    connection.commit()
+    return {"connection": connection, "hypergraph": hypergraph_hash(hypergraph), "hits": 0, "merges": 0}
+
+def close_fitness_store(store: Dict):
+    store["connection"].close()
+
+def lookup_estimates(store: Dict, setting: str, seed_sets: List) -> List[Estimate]:
+    """
+    Stored estimate of each seed set, None for the ones never simulated.
+    """
+    estimates = list()
+    for a in seed_sets:
+        row = store["connection"].execute("SELECT count, mean, m2, activation_attempts FROM estimates WHERE hypergraph=? AND setting=? AND seed_set=?",
+                                          (store["hypergraph"], setting, seed_set_key(a))).fetchone()
+        estimates.append(tuple(row) if row is not None else None)
+    return estimates
+
+def store_estimates(store: Dict, setting: str, seed_sets: List, estimates: List[Estimate], replace: bool = False) -> List[Estimate]:
+    """
+    Merge the estimates of new simulations of the seed sets into the stored
+    ones, in a single transaction, and return the merged estimates. With
+    replace, the new estimates replace the stored ones, for simulations which
+    are not independent of the stored ones.
+    """
+    merged = list()
+    connection = store["connection"]
+    with connection:
+        # the stored estimates are read in the transaction, so that the
+        # estimates merged by a concurrent run are not overwritten
+        connection.execute("BEGIN IMMEDIATE")
+        for a, estimate in zip(seed_sets, estimates):
+            # looked up one at a time, a seed set may occur several times
+            stored = lookup_estimates(store, setting, [a])[0]
+            if stored is not None and not replace:
+                estimate = merge_estimates(stored, estimate)
+            connection.execute("INSERT OR REPLACE INTO estimates VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               (store["hypergraph"], setting, seed_set_key(a)) + tuple(estimate))
+            merged.append(estimate)
+    store["merges"] += len(seed_sets)
+    return merged
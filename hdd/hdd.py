@@ -1,4 +1,6 @@
+from typing import List
 import random
+import heapq
 import argparse
 import time
 import json
@@ -22,36 +24,78 @@ def high_degree_discount(hypergraph: hgx.Hypergraph, k: int):
     -------
         Seed set of k nodes selected by HDD optimization algorithm.
     """
-    seeds = set()
+    return high_degree_discount_prefixes(hypergraph, [k])[0]
 
-    # compute deg_0
-    degree = {} # dict[int, int]
-                # key: node id
-                # value: degree as the number of neighbors
-    for n in hypergraph.get_nodes():
-        degree[n] = len(hypergraph.get_neighbors(n))
+def high_degree_discount_prefixes(hypergraph: hgx.Hypergraph, ks: List[int]):
+    """
+    Execute High Degree Discount algoritm once for all the seed set
+    cardinalities in ks. HDD greedy choices do not depend on k, hence the seed
+    set of size k is made of the first k chosen nodes.
 
-    for i in range(k):
-        # sort nodes according to their adaptive degree
-        sorted_nodes = sorted(degree.keys(), key=lambda x: degree[x], reverse=True)
+    The node with the largest adaptive degree is extracted from a lazy max-heap:
+    adaptive degrees only decrease, so an updated node is pushed again and its
+    stale entries are discarded when they reach the top. Ties are broken by the
+    order of hypergraph.get_nodes(), as in a stable sort.
+
+    Parameters
+    ----------
+    hypergraph : hgx.Hypergraph
+        Hypergraphx Hypergraph object which encodes the input network.
+    
+    ks : list[int]
+        Cardinalities of the seed sets.
 
+    Returns
+    -------
+        Seed sets selected by HDD optimization algorithm, one for each k in ks.
+    """
+    seeds = set()
+    output_seed_sets = {}   # dict[int, list[int]]
+                            # key: seed set cardinality
+                            # value: seed set
+    ks_set = set(ks)
+
+    # compute deg_0
+    nodes = hypergraph.get_nodes()
+    neighbors = {}  # dict[int, set[int]]
+    degree = {}     # dict[int, int]
+                    # key: node id
+                    # value: degree as the number of neighbors
+    for n in nodes:
+        neighbors[n] = hypergraph.get_neighbors(n)
+        degree[n] = len(neighbors[n])
+    seed_neighbors = {n: 0 for n in nodes}  # number of neighbors of n in the seed set
+
+    # heap entries: (-adaptive degree, position in the node list, node id)
+    position = {n: i for i, n in enumerate(nodes)}
+    heap = [(-degree[n], position[n], n) for n in nodes]
+    heapq.heapify(heap)
+
+    for i in range(max(ks, default=0)):
         # select the node with the largest adaptive degree which is not in the
         # seed set yet and add it to the seed set
-        for node in sorted_nodes:
-            if node not in seeds:
+        chosenNode = None
+        while heap:
+            neg_degree, _, node = heapq.heappop(heap)
+            if node not in seeds and -neg_degree == degree[node]:
                 chosenNode = node
                 break
+        if chosenNode is None:
+            break
         seeds.add(chosenNode)
 
-        # update adaptive degree
-        for v_q in hypergraph.get_neighbors(chosenNode):
-            z = 0
-            for v_q_neighbor in hypergraph.get_neighbors(v_q):
-                if v_q_neighbor in seeds:
-                    z += 1
-            degree[v_q] = degree[v_q] - z
+        # update adaptive degree: each neighbor v_q of the chosen node loses as
+        # many units as its neighbors in the seed set
+        for v_q in neighbors[chosenNode]:
+            seed_neighbors[v_q] += 1
+            degree[v_q] = degree[v_q] - seed_neighbors[v_q]
+            if v_q not in seeds:
+                heapq.heappush(heap, (-degree[v_q], position[v_q], v_q))
 
-    return list(seeds)
+        if len(seeds) in ks_set:
+            output_seed_sets[len(seeds)] = list(seeds)
+
+    return [output_seed_sets.get(k, list(seeds)) for k in ks]
 
 
 def read_arguments():
@@ -83,12 +127,10 @@ if __name__ == '__main__':
 
     start_time = time.time()
 
-    output_seed_sets = list()
-    for k in range(args["min_seed_nodes"], max_seed_set_size+1, args["k_step"]):
-        print(f"\nEXECUTION HDD with k={k}")
-
-        seed_set = high_degree_discount(inputHypergraph, k)
-        output_seed_sets.append(seed_set)
+    # a single HDD execution gives the seed sets for all the values of k
+    ks = list(range(args["min_seed_nodes"], max_seed_set_size+1, args["k_step"]))
+    print(f"\nEXECUTION HDD with k={ks}")
+    output_seed_sets = high_degree_discount_prefixes(inputHypergraph, ks)
     
     execution_time = (time.time() - start_time)
 
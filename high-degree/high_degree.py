@@ -2,7 +2,7 @@ import argparse
 import random
 import hypergraphx as hgx
 import json
-from loaders import load_hypergraph
+from loaders import load_hypergraph, node_degree, node_hyperdegree, top_k_nodes
 import time
 
 def read_arguments():
@@ -33,19 +33,15 @@ if __name__ == '__main__':
 
     start_time = time.time()
 
-    # get node degrees or hyperdegrees
-    node_degree = dict()    # key: node id ; value: node degree
-    for node in inputHypergraph.get_nodes():
-        node_degree[node] = len(inputHypergraph.get_neighbors(node)) if args["degree"]=="degree" else inputHypergraph.degree(node)
-
-    # sort nodes according to their degree
-    node_sorted = [n[0] for n in sorted(node_degree.items(), key=lambda x: x[1], reverse=True)]
-    print(len(node_sorted))
-
     # calculate max seed set size based on network size
     max_seed_set_size = int(args["max_seed_nodes"])
     print(f"max_seed_set_size: {max_seed_set_size}")
 
+    # rank the nodes according to their degree or hyperdegree, only the
+    # max_seed_set_size highest ones are needed
+    node_sorted = top_k_nodes(inputHypergraph, node_degree if args["degree"]=="degree" else node_hyperdegree, max_seed_set_size)
+    print(len(node_sorted))
+
     output_seed_sets = list()
     for k in range(args["min_seed_nodes"], max_seed_set_size+1, args["k_step"]):
         print(f"\nEXECUTION high_degree with k={k}")
@@ -1,7 +1,9 @@
-from typing import Dict, Set, Tuple
+from typing import Dict, Set, Tuple, List, Callable
 import hypergraphx as hgx
 import json
 import argparse
+import weakref
+import numpy as np
 import matplotlib.pyplot as plt
 
 def load_hypergraph(file_path:str)->hgx.Hypergraph:
@@ -50,6 +52,71 @@ def save_hypergraph(hypergraph, file_path : str) -> None:
     output_file.close()
     print("hypergraph saved.")
 
+def node_degree(hypergraph: hgx.Hypergraph, n: int) -> int:
+    """
+    Degree of node n, i.e. its number of neighbors.
+    """
+    return len(hypergraph.get_neighbors(n))
+
+def node_hyperdegree(hypergraph: hgx.Hypergraph, n: int) -> int:
+    """
+    Hyperdegree of node n, i.e. the number of hyperedges it belongs to.
+    """
+    return hypergraph.degree(n)
+
+# rankings of the nodes by hypergraph and score function, kept as long as the
+# hypergraph exists, so that repeated runs on the same hypergraph do not score
+# and rank its nodes again
+_node_rankings = weakref.WeakKeyDictionary()
+
+def node_ranking(hypergraph: hgx.Hypergraph, score_function: Callable[[hgx.Hypergraph, int], int]) -> Dict:
+    """
+    Scores of the nodes of the hypergraph, computed once per hypergraph and
+    score function. The score function is the cache key, hence it should be a
+    function defined once (e.g. node_degree or node_hyperdegree) rather than a
+    lambda created at every call.
+
+    Returns
+    -------
+        dict with keys
+        nodes : list of the nodes, in the order of hypergraph.get_nodes()
+        scores : array of the scores of the nodes
+        score : dict node -> score
+        top : longest ranking of the nodes computed so far by top_k_nodes
+    """
+    rankings = _node_rankings.setdefault(hypergraph, dict())
+    if score_function not in rankings:
+        nodes = hypergraph.get_nodes()
+        scores = [score_function(hypergraph, n) for n in nodes]
+        rankings[score_function] = {"nodes": nodes, "scores": np.array(scores), "score": dict(zip(nodes, scores)), "top": []}
+    return rankings[score_function]
+
+def top_k_nodes(hypergraph: hgx.Hypergraph, score_function: Callable[[hgx.Hypergraph, int], int], k: int) -> List[int]:
+    """
+    The k nodes with the highest score, by decreasing score. Ties are broken by
+    the order of hypergraph.get_nodes(), as a stable sort of the nodes by
+    decreasing score would do.
+
+    The nodes are ranked by partial selection (np.partition) and only the
+    selected ones are sorted, in O(|V| + k log k) instead of O(|V| log |V|).
+    The ranking is cached with the scores (see node_ranking), and a shorter
+    ranking is a prefix of a longer one, so only the longest one is kept.
+    """
+    ranking = node_ranking(hypergraph, score_function)
+    nodes = ranking["nodes"]
+    k = min(k, len(nodes))
+    if k <= 0:
+        return []
+    if len(ranking["top"]) < k:
+        negative_scores = -ranking["scores"]
+        # all the nodes scoring at least the k-th highest score, ties included
+        kth = np.partition(negative_scores, k-1)[k-1]
+        selected = np.flatnonzero(negative_scores <= kth)
+        # sorted by decreasing score, then by position
+        selected = selected[np.lexsort((selected, negative_scores[selected]))][:k]
+        ranking["top"] = [nodes[i] for i in selected]
+    return ranking["top"][:k]
+
 def read_arguments():
     parser = argparse.ArgumentParser(description="Hypergraph dataset loader.")
     
@@ -2,105 +2,245 @@ from typing import Dict, Set, Tuple, List
 import hypergraphx as hgx
 import inspyred
 import random
+import time
+import collections
 
 from monte_carlo_max_hop import monte_carlo_max_hop_simulation
 
-from ea.observer import ea_observer, time_observer, hypervolume_observer
-from ea.terminator import generation_termination
-from ea.generator import ea_generator
-from ea.evaluator import ea_evaluator
-from ea.crossover import ea_crossover
-from ea.mutation import ea_mutation, ea_global_random_mutation
+from ea.observer import ea_observer, hypervolume_observer, stream_observer, kernel_counters_observer, init_stream_files, archive_hypervolume
+from ea.terminator import generation_termination, wall_clock_termination, budget_termination, stagnation_termination
+from ea.generator import ea_generator, ea_bitset_generator
+from ea.evaluator import ea_evaluator, seed_set
+from ea.crossover import ea_crossover, ea_bitset_crossover
+from ea.mutation import ea_mutation, ea_global_random_mutation, ea_bitset_mutation, ea_bitset_global_random_mutation
 from ea.archiver import ea_archiver
+from ea.checkpoint import checkpoint_observer, load_checkpoint, save_final_checkpoint
+from ea.timing import timed, timing_observer
+from ea.fidelity import fidelity_observer, reevaluate_archive
+from surrogate import new_surrogate
+from bitset import node_index, to_bitset
+from fitness_store import open_fitness_store, close_fitness_store
 
-def moea_influence_maximization(hypergraph: hgx.Hypergraph,
-                                degree_dict:Dict[int,int],
-                                hyperdegree_dict:Dict[int,int],
-                                neighbor_dict:Dict[int,List[int]],
-                                incident_hyperedge_dict:Dict[int,List[Tuple[int]]],
+def moea_influence_maximization(session: Dict,
+                                config: Dict,
                                 random_gen: random.Random,
-                                min_seed_nodes: int,
-                                max_seed_nodes: float,
-                                population_size: int,
-                                offspring_size: int,
                                 initial_population: List[List[int]],
-                                max_generations: int,
-                                tournament_size: int,
-                                mutation_rate : float,
-                                crossover_rate : float,
-                                num_elites : int,
-                                p_min : float,
-                                p_max : float,
-                                threshold: float,
-                                max_hop: int,
-                                model : str,
-                                no_simulations : int,
-                                n_threads : int,
-                                custom_mutation : bool,
-                                output_activation_attempts_file_path : str,
-                                output_hypervolume_file_path : str):
+                                max_seed_nodes: float,
+                                output_folder_run_path: str):
     """
     
     Multi-objective evolutionary influence maximization.
 
+    session : the hypergraph, its degree, hyperdegree, neighbor and incident
+        hyperedge dictionaries, its nodes and the pool of evaluation workers
+        (None to evaluate locally), see session.new_session
+    config : the arguments of main.py (see config.py), all of them
+    initial_population : seed sets of the initial population, None when the
+        run is resumed from its checkpoint
+    max_seed_nodes : maximum size of the seed sets, as a fraction of the nodes
+    output_folder_run_path : folder of the streamed files and checkpoint of
+        the run, named after the output_*_file_name arguments (a file name
+        set to None disables the file)
+
     """
+    hypergraph = session["hypergraph"]
+    nodes = session["nodes"]
+    model = config["model"]
+    no_simulations = config["no_simulations"]
+    fidelity = config["fidelity"]
+    bitset_genome = config["bitset_genome"]
+    surrogate = config["surrogate"]
+
+    def output_file_path(name):
+        return f"{output_folder_run_path}/{config[name]}" if config[name] is not None else None
+    output_activation_attempts_file_path = output_file_path("output_activation_attempts_file_name")
+    output_hypervolume_file_path = output_file_path("output_hypervolume_file_name")
+    output_generations_file_path = output_file_path("output_generations_file_name")
+    output_timing_file_path = output_file_path("output_timing_file_name")
+    output_kernel_counters_file_path = output_file_path("output_kernel_counters_file_name") if config["kernel_counters"] else None
+    output_surrogate_file_path = output_file_path("output_surrogate_file_name") if surrogate else None
+    checkpoint_file_path = output_file_path("output_checkpoint_file_name") if config["checkpoint_interval"] > 0 else None
+
     # initialize multi-objective evolutionary algorithm NSGA-II
-    max_seed_set_size = int(max_seed_nodes * len(hypergraph.get_nodes()))
+    max_seed_set_size = int(max_seed_nodes * len(nodes))
     print(f"max_seed_set_size: {max_seed_set_size}")
 
     fitness_function = monte_carlo_max_hop_simulation                           # the influence is propagated up to a maximum number of hops
 
+    # delta evaluation replays the same random worlds on every seed set, the
+    # seed of the worlds, unless given, is only drawn when needed not to alter
+    # the other runs
+    crn_seed = config["crn_seed"]
+    if not config["delta_evaluation"]:
+        crn_seed = None
+    elif crn_seed is None:
+        crn_seed = random_gen.getrandbits(64)
+
+    # a resumed run starts from the population of the checkpoint, the rest of
+    # the evolutionary state is restored by checkpoint_observer
+    resume_checkpoint = load_checkpoint(checkpoint_file_path) if config["resume"] is not None else None
+    # with bitset genomes the candidates are bitsets over the nodes (see bitset.py)
+    index = node_index(nodes)
+    if resume_checkpoint is not None:
+        initial_population = [ind.candidate for ind in resume_checkpoint["population"]]
+    else:
+        if bitset_genome:
+            initial_population = [to_bitset(a, index) for a in initial_population]
+        init_stream_files({"activation_attempts_file_path": output_activation_attempts_file_path,
+                           "hypervolume_file_path": output_hypervolume_file_path,
+                           "generations_file_path": output_generations_file_path,
+                           "timing_file_path": output_timing_file_path,
+                           "kernel_counters_file_path": output_kernel_counters_file_path,
+                           "surrogate_file_path": output_surrogate_file_path})
+
     ea = inspyred.ec.emo.NSGA2(random_gen)
     ea.archiver = ea_archiver                                                   # archiver with Pareto preference (Pareto archive)
-    if custom_mutation:
+    if bitset_genome and config["custom_mutation"]:
+        ea.variator = [ea_bitset_crossover, ea_bitset_mutation]                 # the list of variation operators
+    elif bitset_genome:
+        ea.variator = [ea_bitset_crossover, ea_bitset_global_random_mutation]   # the list of variation operators
+    elif config["custom_mutation"]:
         ea.variator = [ea_crossover, ea_mutation]                               # the list of variation operators
     else:
         ea.variator = [ea_crossover, ea_global_random_mutation]                 # the list of variation operators
-    ea.observer = [hypervolume_observer]                                        # the (possibly list of) observer(s)
-    ea.terminator = generation_termination                                      # the (possibly list of) terminator(s)
+    ea.observer = [hypervolume_observer, stream_observer, checkpoint_observer]  # the (possibly list of) observer(s)
+    ea.terminator = [generation_termination]                                    # the (possibly list of) terminator(s)
+    if config["max_seconds"] is not None:
+        ea.terminator.append(wall_clock_termination)                            # stop before the wall-clock deadline
+    if config["max_simulations"] is not None or config["max_activation_attempts"] is not None:
+        ea.terminator.append(budget_termination)                                # stop when the simulations or activation attempts budget is exhausted
+    if config["stagnation_generations"] is not None:
+        ea.terminator.append(stagnation_termination)                            # stop when the HV does not improve anymore
+
+    evaluator = ea_evaluator
+    if output_timing_file_path is not None:
+        # measure the wall time of each phase of the generation, see timing_observer
+        evaluator = timed("evaluation", ea_evaluator)
+        ea.selector = timed("selection", ea.selector)
+        ea.replacer = timed("replacement", ea.replacer)
+        ea.archiver = timed("archiving", ea.archiver)
+        ea.variator = [timed("crossover", ea.variator[0]), timed("mutation", ea.variator[1])]
+        ea.observer = [timed("hypervolume", hypervolume_observer), stream_observer, timing_observer, timed("checkpoint", checkpoint_observer)]
+    if output_kernel_counters_file_path is not None:
+        # before checkpoint_observer, which has to be the last one
+        ea.observer.insert(-1, kernel_counters_observer)
+    if fidelity != "fixed":
+        # right after hypervolume_observer, whose HV it reads
+        ea.observer.insert(1, fidelity_observer)
+
+    # with a multi-fidelity schedule the run starts with fewer simulations
+    initial_simulations = no_simulations if fidelity == "fixed" else min(config["min_simulations"], no_simulations)
+
+    # the run stops before this time, if given
+    deadline = time.time() + config["max_seconds"] if config["max_seconds"] is not None else None
+
+    # only the HVs needed by stagnation_termination are kept
+    recent_hypervolumes = collections.deque(maxlen=(config["stagnation_generations"] or 0)+1)
+
+    # spread estimates of the previous runs
+    fitness_store = open_fitness_store(config["fitness_store_path"], hypergraph) if config["fitness_store_path"] is not None else None
+
+    # surrogate of the spread fitted to the simulated seed sets
+    surrogate_model = new_surrogate(config["surrogate_z"], config["surrogate_min_samples"], config["surrogate_max_samples"]) if surrogate else None
 
     # start the evolutionary process
     final_pop = ea.evolve(
-        generator = ea_generator,                                               # the function to be used to generate candidate solutions # TODO riflettere su initial population, vedi anche argument seeds sotto
-        evaluator = ea_evaluator,                                               # the function to be used to evaluate candidate solutions
-        bounder = inspyred.ec.DiscreteBounder(hypergraph.get_nodes()),          # a function used to bound candidate solutions
+        generator = ea_bitset_generator if bitset_genome else ea_generator,     # the function to be used to generate candidate solutions # TODO riflettere su initial population, vedi anche argument seeds sotto
+        evaluator = evaluator,                                                  # the function to be used to evaluate candidate solutions
+        bounder = inspyred.ec.DiscreteBounder(nodes),                           # a function used to bound candidate solutions
         maximize = True,                                                        # boolean value stating use of maximization
         seeds = initial_population,                                             # individuals (seed sets) to be added to the initial population (the rest will be randomly generated) # TODO riflettere su initial population, vedi anche argument generator sopra
-        pop_size = population_size,                                             # the number of Individuals in the population 
-        num_selected = offspring_size,                                          # offspring of the EA
-        generations_budget = max_generations,                                   # maximum generations
-        tournament_size = tournament_size,                                      # EA tournament size
-        mutation_rate = mutation_rate,                                          # the rate at which mutation is performed
-        crossover_rate = crossover_rate,                                        # the rate at which crossover is performed
-        num_elites = num_elites,                                                # number of elites to consider
+        pop_size = config["population_size"],                                   # the number of Individuals in the population 
+        num_selected = config["offspring_size"],                                # offspring of the EA
+        generations_budget = config["max_generations"],                         # maximum generations
+        tournament_size = config["tournament_size"],                            # EA tournament size
+        mutation_rate = config["mutation_rate"],                                # the rate at which mutation is performed
+        crossover_rate = config["crossover_rate"],                              # the rate at which crossover is performed
+        num_elites = config["num_elites"],                                      # number of elites to consider
         hypergraph = hypergraph,                                                # input hypergraph network
-        degree_dict = degree_dict,                                              # degree_dict[i] = degree node i
-        hyperdegree_dict = hyperdegree_dict,                                    # hyperdegree_dict[i] = hyperdegree node i
-        neighbor_dict = neighbor_dict,                                          # neighbor_dict[i] = list of neighbors of node i
-        incident_hyperedge_dict = incident_hyperedge_dict,                      # incident_hyperedge_dict[i] = list of incident hyperedges of node i
-        p_min = p_min,                                                          # probability MIN for SICP propagation model
-        p_max = p_max,                                                          # probability MAX for SICP propagation model
-        threshold = threshold,                                                  # threshold for LT propagation model
-        max_hop = max_hop,                                                      # maximum number of influence propagation time steps for SICP propagation model
+        degree_dict = session["degree_dict"],                                   # degree_dict[i] = degree node i
+        hyperdegree_dict = session["hyperdegree_dict"],                         # hyperdegree_dict[i] = hyperdegree node i
+        neighbor_dict = session["neighbor_dict"],                               # neighbor_dict[i] = list of neighbors of node i
+        incident_hyperedge_dict = session["incident_hyperedge_dict"],           # incident_hyperedge_dict[i] = list of incident hyperedges of node i
+        p_min = config["p_min"],                                                # probability MIN for SICP propagation model
+        p_max = config["p_max"],                                                # probability MAX for SICP propagation model
+        threshold = config["threshold"],                                        # threshold for LT propagation model
+        max_hop = config["max_hop"],                                            # maximum number of influence propagation time steps for SICP propagation model
         propagation_model = model,                                              # type of influence propagation model
-        no_simulations = no_simulations,                                        # number of simulations for spread calculation
-        nodes = hypergraph.get_nodes(),                                         # hypergraph nodes
-        min_seed_nodes = min_seed_nodes,                                        # minimum number of nodes in a seed set
+        no_simulations = initial_simulations,                                   # number of simulations for spread calculation
+        full_simulations = no_simulations,                                      # number of simulations at full fidelity
+        fidelity = fidelity,                                                    # schedule of the number of simulations: fixed, schedule or stagnation
+        fidelity_interval = config["fidelity_interval"],                        # number of generations between two raises of the number of simulations
+        fidelity_epsilon = config["fidelity_epsilon"],                          # minimum HV improvement over fidelity_interval generations (stagnation)
+        fidelity_generation = 0,                                                # generation of the last check of fidelity_observer
+        fidelity_hypervolume = 0.0,                                             # HV at the last check of fidelity_observer
+        nodes = nodes,                                                          # hypergraph nodes
+        min_seed_nodes = config["min_seed_nodes"],                              # minimum number of nodes in a seed set
         max_seed_nodes = max_seed_set_size,                                     # maximum number of nodes in a seed set
         fitness_function = fitness_function,                                    # fitness_function
         random_generator = random_gen,                                          # already initialized pseudo-random number generation
-        time = [],                                                              # keep track of Time (Activation Attempts) trend throughout the generations
-        hypervolume = [],                                                       # keep track of HV trend throughout the generations
-        n_threads = n_threads,                                                  # number of threads to handle parallel computation
+        time = [],                                                              # Time (Activation Attempts) of the current generation, written by stream_observer
+        hypervolume = [],                                                       # HV of the current generation, written by stream_observer
+        n_threads = config["n_threads"],                                        # number of threads to handle parallel computation
+        delta_evaluation = config["delta_evaluation"],                          # evaluate offspring differing by one gene from an evaluated seed set incrementally
+        delta_cache = dict(),                                                   # simulation state of the evaluated seed sets of the current population
+        delta_max_distance = config["delta_max_distance"],                      # maximum number of added or removed seeds for delta evaluation
+        node_index = index,                                                     # position of each node in nodes, i.e. its bit for bitset genomes
+        bitset_genome = bitset_genome,                                          # whether the candidates are bitsets (see bitset.py) or lists of nodes
+        deduplication = not config["no_deduplication"],                         # evaluate each distinct seed set of the offspring once
+        duplicate_rate = 0.0,                                                   # fraction of the offspring of the current generation which were duplicates
+        remote_pool = session["remote_pool"],                                   # connections to the remote evaluation workers, None to evaluate locally
+        fitness_store = fitness_store,                                          # spread estimates shared by the runs, None not to use them
+        sample_estimates = dict() if config["accumulate_samples"] else None,    # (simulations, mean, M2, activation attempts) of the seed sets evaluated in the run
+        top_up_simulations = config["top_up_simulations"],                      # simulations added to the estimate of a seed set evaluated again
+        crn_seed = crn_seed,                                                    # seed of the common random numbers of delta evaluation
+        checkpoint_file_path = checkpoint_file_path,                            # file path where to store the checkpoint of the evolutionary state
+        checkpoint_interval = config["checkpoint_interval"],                    # number of generations between two checkpoints
+        resume_checkpoint = resume_checkpoint,                                  # checkpoint from which the run is resumed
         activation_attempts_file_path = output_activation_attempts_file_path,   # file path where to store the number of activation attempts
-        hypervolume_file_path = output_hypervolume_file_path                    # file path where to store the hypervolume of the final population
+        hypervolume_file_path = output_hypervolume_file_path,                   # file path where to store the hypervolume of each generation
+        generations_file_path = output_generations_file_path,                   # file path where to store the statistics of each generation
+        generation_start_time = time.time(),                                    # starting time of the current generation
+        timing_file_path = output_timing_file_path,                             # file path where to store the wall time of each phase of each generation
+        phase_times = dict(),                                                   # wall time of each phase of the current generation
+        timing_start_time = time.perf_counter(),                                # starting time of the current generation for timing_observer
+        timing_num_evaluations = 0,                                             # number of evaluations at the end of the previous generation
+        timing_total_simulations = 0,                                           # number of simulations at the end of the previous generation
+        kernel_counters_file_path = output_kernel_counters_file_path,           # file path where to store the hot-path counters of the propagation models
+        kernel_counters = [],                                                   # (seed set size, hot-path counters) of the candidates of the current generation
+        deadline = deadline,                                                    # wall-clock deadline of the run
+        last_generation_end_time = time.time(),                                 # end time of the last generation for wall_clock_termination
+        simulations_budget = config["max_simulations"],                         # maximum number of Monte Carlo simulations
+        activation_attempts_budget = config["max_activation_attempts"],         # maximum number of activation attempts
+        total_activation_attempts = 0,                                          # activation attempts since the beginning of the run
+        total_simulations = 0,                                                  # Monte Carlo simulations since the beginning of the run
+        stagnation_generations = config["stagnation_generations"],              # number of generations over which the HV improvement is measured
+        stagnation_epsilon = config["stagnation_epsilon"],                      # minimum HV improvement over stagnation_generations generations
+        recent_hypervolumes = recent_hypervolumes,                              # HV of the last stagnation_generations+1 generations
+        surrogate = surrogate_model,                                            # surrogate model for the pre-screening of the offspring
+        surrogate_file_path = output_surrogate_file_path                        # file path where to store the number of simulated offspring of each generation
     )
 
+    print(f"termination cause: {ea.termination_cause}")
+
+    if fidelity != "fixed":
+        # the archive members evaluated with fewer simulations are evaluated
+        # again at full fidelity before being returned
+        ea.archive = reevaluate_archive(ea)
+        print(f"full fidelity hypervolume: {archive_hypervolume(ea.archive)}")
+    print(f"total simulations: {ea._kwargs['total_simulations']}")
+    if config["accumulate_samples"] and fitness_store is None:
+        print(f"accumulated estimates: {len(ea._kwargs['sample_estimates'])} seed sets, up to {max((e[0] for e in ea._kwargs['sample_estimates'].values()), default=0)} simulations")
+    save_final_checkpoint(ea)
+    if fitness_store is not None:
+        print(f"fitness store: {fitness_store['hits']} seed sets reused, {fitness_store['merges']} estimates merged")
+        close_fitness_store(fitness_store)
+
     # extract seed sets from the final Pareto front
     print(f"final_pop: {len(final_pop)}")
     print(f"ea_archive: {len(ea.archive)}")
 
-    pareto_front = [[individual.candidate, individual.fitness[0]*100, ((len(individual.candidate)  / len(hypergraph.get_nodes())) * 100)] for individual in ea.archive] 
-    final_pop = [[individual.candidate, individual.fitness[0]*100, ((len(individual.candidate)  / len(hypergraph.get_nodes())) * 100)] for individual in final_pop] 
+    pareto_front = [[seed_set(individual.candidate, ea._kwargs), individual.fitness[0]*100, ((len(seed_set(individual.candidate, ea._kwargs))  / len(nodes)) * 100)] for individual in ea.archive] 
+    final_pop = [[seed_set(individual.candidate, ea._kwargs), individual.fitness[0]*100, ((len(seed_set(individual.candidate, ea._kwargs))  / len(nodes)) * 100)] for individual in final_pop] 
 
     return pareto_front, final_pop
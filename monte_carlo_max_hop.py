@@ -14,22 +14,23 @@ def monte_carlo_max_hop_simulation(hypergraph: hgx.Hypergraph,
                                    no_simulations: int,
                                    max_hop:int,
                                    model: str,
-                                   random_generator: random.Random):
+                                   random_generator: random.Random,
+                                   counters: Dict = None):
     results = []
     times = []
 
     if model=="WC":
         for i in range(no_simulations):
-            res, time = wc_max_hop_model(hypergraph, degree_dict, neighbor_dict, a, max_hop, random_generator)
+            res, time = wc_max_hop_model(hypergraph, degree_dict, neighbor_dict, a, max_hop, random_generator, counters)
             results.append(res)
             times.append(time)
     elif model=="LT":
-        res, time = lt_max_hop_model(hypergraph, incident_hyperedge_dict, a, t, max_hop)
+        res, time = lt_max_hop_model(hypergraph, incident_hyperedge_dict, a, t, max_hop, counters)
         results.append(res)
         times.append(time)
     elif model=="SICP":
         for i in range(no_simulations):
-            res, time = sicp_max_hop_model(hypergraph, incident_hyperedge_dict, a, p_min, p_max, max_hop, random_generator)
+            res, time = sicp_max_hop_model(hypergraph, incident_hyperedge_dict, a, p_min, p_max, max_hop, random_generator, counters)
             results.append(res)
             times.append(time)
     else:
@@ -38,13 +39,63 @@ def monte_carlo_max_hop_simulation(hypergraph: hgx.Hypergraph,
         
     return (np.mean(results), np.std(results), sum(times))
 
+def new_counters() -> Dict:
+    """
+    Empty hot-path counters of the propagation models.
+
+    simulations : number of simulations
+    hops : number of hops executed
+    early_convergences : number of simulations in which the propagation stopped
+        before max_hop because no node was activated in a hop
+    activation_attempts : same as the time returned by the models
+    hyperedges_scanned : incident hyperedges visited (LT, SICP)
+    neighbors_scanned : neighbors visited (WC)
+    rng_draws : number of pseudo-random numbers drawn
+    hop_reached[h] : number of simulations which executed hop h
+    frontier[h] : sum over the simulations of the number of nodes propagating
+        the influence at hop h (newly activated nodes for WC and LT, infected
+        nodes for SICP)
+    """
+    return {"simulations": 0, "hops": 0, "early_convergences": 0, "activation_attempts": 0,
+            "hyperedges_scanned": 0, "neighbors_scanned": 0, "rng_draws": 0,
+            "hop_reached": [], "frontier": []}
+
+def merge_counters(total: Dict, counters: Dict):
+    """
+    Add counters to total.
+    """
+    for key, value in counters.items():
+        if isinstance(value, list):
+            total[key].extend([0]*(len(value)-len(total[key])))
+            for h in range(len(value)):
+                total[key][h] += value[h]
+        else:
+            total[key] += value
+
+def count_hop(counters: Dict, hop: int, frontier: int, attempts: int, hyperedges_scanned: int, neighbors_scanned: int, rng_draws: int):
+    """
+    Update the counters at the end of a hop. The models only call it when
+    counters are enabled, once per hop, so that the inner loops are unchanged.
+    """
+    if len(counters["frontier"]) <= hop:
+        counters["frontier"].append(0)
+        counters["hop_reached"].append(0)
+    counters["frontier"][hop] += frontier
+    counters["hop_reached"][hop] += 1
+    counters["hops"] += 1
+    counters["activation_attempts"] += attempts
+    counters["hyperedges_scanned"] += hyperedges_scanned
+    counters["neighbors_scanned"] += neighbors_scanned
+    counters["rng_draws"] += rng_draws
+
 def sicp_max_hop_model(hypergraph: hgx.Hypergraph,
                        incident_hyperedge_dict:Dict[int,List[Tuple[int]]],
                        a: Set[int],
                        p_min: float,
                        p_max: float,
                        max_hop:int,
-                       random_generator: random.Random):
+                       random_generator: random.Random,
+                       counters: Dict = None):
     """
     Susceptible-Infected (SI) model with Contact Process (CP) dynamics on
     hypergraphs as proposed in: https://arxiv.org/abs/2206.01394
@@ -61,6 +112,8 @@ def sicp_max_hop_model(hypergraph: hgx.Hypergraph,
         number of hops of the propagation model
     random_generator : random.Random
         already initialized pseudo-random number generator
+    counters : dict
+        hot-path counters to be updated (see new_counters), None to disable them
 
     Returns
     -------
@@ -71,8 +124,10 @@ def sicp_max_hop_model(hypergraph: hgx.Hypergraph,
     I = set(a)  # set of infected nodes
     time = 0    # keep track of how much time it takes the propagation to converge to the optimal solution
     converged = False
+    hop = 0
 
     while (not converged) and (max_hop > 0):
+        hop_time = time
         nextI = set()
         for n in I:
             # for each I-state node find all the hyperedges it belongs to
@@ -91,10 +146,19 @@ def sicp_max_hop_model(hypergraph: hgx.Hypergraph,
                     if prob <= p:
                         nextI.add(m)
         
+        if counters is not None:
+            # one hyperedge chosen per infected node, two draws per attempt
+            count_hop(counters, hop, len(I), time-hop_time, len(I), 0, len(I)+2*(time-hop_time))
+        hop += 1
+
         if not nextI:
             converged = True
         I = I.union(nextI)
         max_hop -= 1
+
+    if counters is not None:
+        counters["simulations"] += 1
+        counters["early_convergences"] += converged
     
     return len(I), time
 
@@ -103,7 +167,8 @@ def wc_max_hop_model(hypergraph: hgx.Hypergraph,
                      neighbor_dict:Dict[int,List[int]],
                      a: Set[int],
                      max_hop:int,
-                     random_generator: random.Random):
+                     random_generator: random.Random,
+                     counters: Dict = None):
     """
     Weighted Cascade propagation model.
 
@@ -117,6 +182,8 @@ def wc_max_hop_model(hypergraph: hgx.Hypergraph,
         number of hops of the propagation model
     random_generator : random.Random
         already initialized pseudo-random number generator
+    counters : dict
+        hot-path counters to be updated (see new_counters), None to disable them
 
     Returns
     -------
@@ -128,8 +195,12 @@ def wc_max_hop_model(hypergraph: hgx.Hypergraph,
     B = set(a)  # set of nodes activated in the last time slot
     converged = False
     time = 0    # keep track of how much time it takes the propagation to converge to the optimal solution
+    hop = 0
 
     while (not converged) and (max_hop > 0):
+        hop_time = time
+        if counters is not None:
+            neighbors_scanned = sum(len(neighbor_dict[n]) for n in B)
         nextB = set()
         for n in B:
             for m in neighbor_dict[n]-A:
@@ -143,11 +214,20 @@ def wc_max_hop_model(hypergraph: hgx.Hypergraph,
                 time = time+1
                 if prob <= p:
                     nextB.add(m)
+        if counters is not None:
+            # one draw per attempt
+            count_hop(counters, hop, len(B), time-hop_time, 0, neighbors_scanned, time-hop_time)
+        hop += 1
+
         B = set(nextB)
         if not B:
             converged = True
         A = A.union(B)
         max_hop -= 1
+
+    if counters is not None:
+        counters["simulations"] += 1
+        counters["early_convergences"] += converged
     
     return len(A), time
 
@@ -155,7 +235,8 @@ def lt_max_hop_model(hypergraph: hgx.Hypergraph,
                      incident_hyperedge_dict:Dict[int,List[Tuple[int]]],
                      a: Set[int],
                      t: float,
-                     max_hop:int):
+                     max_hop:int,
+                     counters: Dict = None):
     """
     Linear threshold propagation model as described in https://doi.org/10.1063/5.0178329.
 
@@ -169,6 +250,8 @@ def lt_max_hop_model(hypergraph: hgx.Hypergraph,
         threshold value in (0,1)
     max_hop : int
         number of hops of the propagation model 
+    counters : dict
+        hot-path counters to be updated (see new_counters), None to disable them
 
     Returns
     -------
@@ -181,8 +264,10 @@ def lt_max_hop_model(hypergraph: hgx.Hypergraph,
     C = set()   # set of active hyperedges
     converged = False
     time = 0    # keep track of how much time it takes the propagation to converge to the optimal solution
+    hop = 0
 
     while (not converged) and (max_hop > 0):
+        hop_time = time
         nextB = set()
 
         for n in B:
@@ -207,10 +292,19 @@ def lt_max_hop_model(hypergraph: hgx.Hypergraph,
                                 # activate the node
                                 nextB.add(j)
 
+        if counters is not None:
+            # deterministic model, no draws
+            count_hop(counters, hop, len(B), time-hop_time, sum(len(incident_hyperedge_dict[n]) for n in B), 0, 0)
+        hop += 1
+
         B = set(nextB)
         if not B:
             converged = True
         A = A.union(B)
         max_hop -= 1
+
+    if counters is not None:
+        counters["simulations"] += 1
+        counters["early_convergences"] += converged
     
     return len(A), time
\ No newline at end of file
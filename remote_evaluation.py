@@ -0,0 +1,346 @@
+from typing import Dict, List, Tuple
+import time
+import random
+import socket
+import struct
+import pickle
+import argparse
+import selectors
+import collections
+import multiprocessing
+import hypergraphx as hgx
+
+from loaders import load_hypergraph
+from monte_carlo_max_hop import monte_carlo_max_hop_simulation
+from fitness_store import hypergraph_hash
+
+# Evaluation of seed sets on remote workers.
+#
+# A worker loads the hypergraph, precomputes its index (degree, neighbor and
+# incident hyperedge dictionaries) once, and serves a coordinator over TCP:
+# it receives batches of seed sets and sends back the (mean, std, time) of
+# monte_carlo_max_hop_simulation for each of them. The coordinator keeps one
+# connection per worker, sends one batch at a time to every idle worker and
+# sends the batches of lost workers (closed connection or no answer within the
+# timeout) again to the other ones. A batch which raises an error on a worker
+# is not sent again, the error is raised by the coordinator. A batch is
+# identified by the call of the coordinator and its position in the call, the
+# answers which do not match the batch sent to the worker are dropped, and the
+# connections still waiting for an answer when a call fails are closed, so
+# that a late answer is never taken for one of the next call.
+#
+# Every seed set is simulated with its own pseudo-random number generator,
+# seeded by the coordinator, so the results do not depend on the worker which
+# evaluates it nor on the retries.
+#
+# Messages are pickled objects preceded by their length (8 bytes, big endian).
+# Unpickling executes arbitrary code, hence workers must only be reachable
+# from trusted hosts.
+
+HEADER = struct.Struct(">Q")
+
+# seconds to connect to a worker and receive its hello, the timeout of the
+# pool applies to the batches only
+CONNECT_TIMEOUT = 10.0
+
+def send_message(connection: socket.socket, message):
+    data = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    connection.sendall(HEADER.pack(len(data)) + data)
+
+def receive_message(connection: socket.socket):
+    """
+    Receive one message, raise ConnectionError if the connection is closed.
+    """
+    def receive_bytes(size):
+        data = bytearray()
+        while len(data) < size:
+            chunk = connection.recv(min(size - len(data), 1 << 20))
+            if not chunk:
+                raise ConnectionError("connection closed")
+            data.extend(chunk)
+        return bytes(data)
+    size, = HEADER.unpack(receive_bytes(HEADER.size))
+    return pickle.loads(receive_bytes(size))
+
+# === WORKER ===================================================================
+def hypergraph_index(hypergraph: hgx.Hypergraph) -> Dict:
+    """
+    Degree, neighbor list and incident hyperedge list of every node, computed
+    once and kept in memory by the worker.
+    """
+    index = {"hypergraph": hypergraph, "degree_dict": dict(), "neighbor_dict": dict(), "incident_hyperedge_dict": dict()}
+    for n in hypergraph.get_nodes():
+        index["degree_dict"][n] = len(hypergraph.get_neighbors(n))
+        index["neighbor_dict"][n] = hypergraph.get_neighbors(n)
+        index["incident_hyperedge_dict"][n] = hypergraph.get_incident_edges(n)
+    return index
+
+def evaluate_batch(index: Dict, seed_sets: List[List[int]], seeds: List[int], settings: Dict) -> List[Tuple[float,float,int]]:
+    """
+    (mean, std, time) of monte_carlo_max_hop_simulation for each seed set,
+    simulated with a pseudo-random number generator initialized with its seed.
+    """
+    results = list()
+    for a, seed in zip(seed_sets, seeds):
+        influence_mean, influence_std, time = monte_carlo_max_hop_simulation(
+            hypergraph=index["hypergraph"],
+            degree_dict=index["degree_dict"],
+            neighbor_dict=index["neighbor_dict"],
+            incident_hyperedge_dict=index["incident_hyperedge_dict"],
+            a=set(a),
+            t=settings["threshold"],
+            p_min=settings["p_min"],
+            p_max=settings["p_max"],
+            no_simulations=settings["no_simulations"],
+            max_hop=settings["max_hop"],
+            model=settings["model"],
+            random_generator=random.Random(seed)
+        )
+        results.append((float(influence_mean), float(influence_std), time))
+    return results
+
+def run_worker(hypergraph_path: str, host: str, port: int, port_queue=None):
+    """
+    Serve coordinators, one connection at a time, forever.
+
+    Parameters
+    ----------
+    hypergraph_path : str
+        file path of the JSON file encoding the hypergraph
+    host, port : str, int
+        address to listen on, port 0 to let the system choose a free one
+    port_queue : multiprocessing.Queue
+        queue where to put the port actually listened on, if not None
+    """
+    index = hypergraph_index(load_hypergraph(hypergraph_path))
+    hypergraph = index["hypergraph"]
+    content_hash = hypergraph_hash(hypergraph)
+
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server.bind((host, port))
+    server.listen()
+    print(f"evaluation worker listening on {host}:{server.getsockname()[1]}")
+    if port_queue is not None:
+        port_queue.put(server.getsockname()[1])
+
+    while True:
+        connection, address = server.accept()
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            # the coordinator checks that the worker holds the same hypergraph
+            send_message(connection, {"type": "hello", "hypergraph_hash": content_hash})
+            while True:
+                message = receive_message(connection)
+                try:
+                    results = evaluate_batch(index, message["seed_sets"], message["seeds"], message["settings"])
+                except Exception as e:
+                    # the batch would fail on any worker, the coordinator
+                    # raises the error instead of sending it again (a
+                    # malformed request is answered the same way)
+                    send_message(connection, {"type": "error", "call": message.get("call"), "batch": message.get("batch"), "error": repr(e)})
+                    continue
+                send_message(connection, {"type": "results", "call": message["call"], "batch": message["batch"], "results": results})
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            connection.close()
+
+def start_local_workers(hypergraph_path: str, no_workers: int) -> Tuple[List[multiprocessing.Process], List[str]]:
+    """
+    Start no_workers evaluation workers on localhost, each in its own process
+    and on a free port, as a stand-in for remote workers.
+
+    Returns
+    -------
+        the processes and the addresses (host:port) of the workers.
+    """
+    port_queue = multiprocessing.Queue()
+    processes = list()
+    for _ in range(no_workers):
+        process = multiprocessing.Process(target=run_worker, args=(hypergraph_path, "127.0.0.1", 0, port_queue), daemon=True)
+        process.start()
+        processes.append(process)
+    addresses = [f"127.0.0.1:{port_queue.get()}" for _ in range(no_workers)]
+    return processes, addresses
+
+def stop_local_workers(processes: List[multiprocessing.Process]):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join()
+
+# === COORDINATOR ==============================================================
+def connect_workers(addresses: List[str], hypergraph: hgx.Hypergraph, batch_size: int, timeout: float, retries: int) -> Dict:
+    """
+    Connect to the evaluation workers.
+
+    Parameters
+    ----------
+    addresses : list[str]
+        addresses of the workers, as host:port
+    hypergraph : hgx.Hypergraph
+        hypergraph the workers must hold
+    batch_size : int
+        number of seed sets sent to a worker at once
+    timeout : float
+        seconds after which a worker which did not answer is considered lost
+    retries : int
+        number of times a batch is sent again after its worker is lost
+
+    Returns
+    -------
+        the pool of workers, used by remote_evaluate.
+    """
+    pool = {"addresses": addresses, "hypergraph_hash": hypergraph_hash(hypergraph),
+            "batch_size": batch_size, "timeout": timeout, "retries": retries, "connections": dict(), "calls": 0}
+    reconnect_workers(pool)
+    if not pool["connections"]:
+        raise RuntimeError(f"no evaluation worker reachable at {addresses}")
+    return pool
+
+def reconnect_workers(pool: Dict):
+    """
+    Connect to the workers which are not connected, skipping the unreachable
+    ones.
+    """
+    for address in pool["addresses"]:
+        if address in pool["connections"]:
+            continue
+        host, port = address.rsplit(":", 1)
+        try:
+            connection = socket.create_connection((host, int(port)), timeout=CONNECT_TIMEOUT)
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            hello = receive_message(connection)
+            connection.settimeout(pool["timeout"])
+        except (ConnectionError, OSError) as e:
+            print(f"evaluation worker {address} unreachable: {e}")
+            continue
+        if hello["hypergraph_hash"] != pool["hypergraph_hash"]:
+            connection.close()
+            raise RuntimeError(f"evaluation worker {address} holds a different hypergraph")
+        pool["connections"][address] = connection
+
+def close_workers(pool: Dict):
+    for connection in pool["connections"].values():
+        connection.close()
+    pool["connections"].clear()
+
+def remote_evaluate(pool: Dict, seed_sets: List[List[int]], seeds: List[int], settings: Dict) -> List[Tuple[float,float,int]]:
+    """
+    (mean, std, time) of monte_carlo_max_hop_simulation for each seed set,
+    evaluated by the workers of the pool in batches of pool["batch_size"].
+
+    Parameters
+    ----------
+    seed_sets : list[list[int]]
+        seed sets to be evaluated
+    seeds : list[int]
+        seed of the pseudo-random number generator of each seed set
+    settings : dict
+        threshold, p_min, p_max, no_simulations, max_hop and model
+    """
+    reconnect_workers(pool)
+    pool["calls"] += 1
+    call = pool["calls"]
+
+    batches = [list(range(i, min(i + pool["batch_size"], len(seed_sets)))) for i in range(0, len(seed_sets), pool["batch_size"])]
+    pending = collections.deque(range(len(batches)))
+    failures = [0]*len(batches)
+    results = [None]*len(seed_sets)
+
+    selector = selectors.DefaultSelector()
+    idle = list(pool["connections"].items())
+    busy = dict()                               # address -> (connection, batch, time it was sent)
+    error = None                                # error raised by a worker, once the other batches are over
+
+    def lose(address, connection, batch):
+        # the batch of a lost worker is sent again to another worker
+        print(f"evaluation worker {address} lost, batch {batch} sent again")
+        if address in busy:
+            selector.unregister(connection)
+            del busy[address]
+        connection.close()
+        del pool["connections"][address]
+        failures[batch] += 1
+        if failures[batch] > pool["retries"]:
+            raise RuntimeError(f"batch {batch} failed {failures[batch]} times")
+        pending.appendleft(batch)
+
+    try:
+        while (pending and error is None) or busy:
+            # send a batch to each idle worker
+            while pending and idle and error is None:
+                address, connection = idle.pop()
+                batch = pending.popleft()
+                try:
+                    send_message(connection, {"call": call, "batch": batch, "seed_sets": [seed_sets[i] for i in batches[batch]],
+                                              "seeds": [seeds[i] for i in batches[batch]], "settings": settings})
+                except (ConnectionError, OSError):
+                    lose(address, connection, batch)
+                    continue
+                selector.register(connection, selectors.EVENT_READ, address)
+                busy[address] = (connection, batch, time.time())
+
+            if not busy:
+                # every worker has been lost, the ones which came back are used
+                reconnect_workers(pool)
+                idle = [(a, c) for a, c in pool["connections"].items()]
+                if not idle:
+                    raise RuntimeError("no evaluation worker available")
+                continue
+
+            for key, _ in selector.select(timeout=1.0):
+                address = key.data
+                connection, batch, _ = busy[address]
+                try:
+                    message = receive_message(connection)
+                except (ConnectionError, OSError):
+                    lose(address, connection, batch)
+                    continue
+                if (message.get("call"), message.get("batch")) != (call, batch):
+                    # answer to another batch (e.g. of a previous call), the
+                    # worker is still evaluating the one sent to it
+                    continue
+                if message["type"] == "error":
+                    # the answers of the other workers are still read, so that
+                    # they are not mistaken for the ones of the next call
+                    error = f"evaluation worker {address} failed on batch {batch}: {message['error']}"
+                else:
+                    for i, result in zip(batches[batch], message["results"]):
+                        results[i] = result
+                selector.unregister(connection)
+                del busy[address]
+                idle.append((address, connection))
+
+            # workers which did not answer within the timeout are lost
+            now = time.time()
+            for address, (connection, batch, sent_time) in list(busy.items()):
+                if now - sent_time > pool["timeout"]:
+                    lose(address, connection, batch)
+    finally:
+        selector.close()
+        # the answers of the busy workers would be read by the next call
+        for address, (connection, _, _) in busy.items():
+            connection.close()
+            del pool["connections"][address]
+
+    if error is not None:
+        raise RuntimeError(error)
+    return results
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Remote evaluation worker of the seed sets.")
+
+    parser.add_argument("--hypergraph_path", type=str, default="data/restaurant.json", help="File path of the JSON file encoding the hypergraph (the same one of the coordinator).")
+    parser.add_argument("--host", type=str, default="0.0.0.0", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=5050, help="Port to listen on.")
+
+    args = parser.parse_args()
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+    run_worker(args["hypergraph_path"], args["host"], args["port"])
@@ -0,0 +1,157 @@
+from typing import Dict, List, Tuple
+import os
+import random
+import hypergraphx as hgx
+
+from config import default_config
+from loaders import load_hypergraph, node_degree
+from smart_initialization import create_initial_population, warm_start_population
+from moea import moea_influence_maximization
+from remote_evaluation import start_local_workers, stop_local_workers, connect_workers, close_workers
+
+# Optimizer session on one hypergraph.
+#
+# The session holds what does not change from a run to the next one: the
+# hypergraph, its degree, hyperdegree, neighbor and incident hyperedge
+# dictionaries, the list of its nodes and the pool of evaluation workers. The
+# node ranking of the smart initialization is cached on the hypergraph (see
+# loaders.node_ranking), hence it is computed by the first run only. A
+# parameter sweep opens the session once and runs every configuration in it:
+#
+#   session = new_session("data/restaurant.json", local_workers=4)
+#   for mutation_rate in [0.05, 0.1, 0.2]:
+#       config = {"mutation_rate": mutation_rate, "max_generations": 50}
+#       pareto_front, final_pop = run_session(session, config, f"output/sweep/{mutation_rate}")
+#   close_session(session)
+#
+# A configuration holds the arguments of main.py, the missing ones taking
+# their default value. The arguments fixed by the session (hypergraph and
+# evaluation workers) cannot be changed by a configuration.
+
+# arguments of main.py fixed for the whole session
+SESSION_ARGUMENTS = ["hypergraph_path", "remote_workers", "local_workers", "remote_batch_size", "remote_timeout", "remote_retries"]
+
+# maximum size of the seed sets of the smart initialization
+INIT_SEED_SET_SIZE = 100
+
+def new_session(hypergraph_path: str, remote_workers: List[str] = None, local_workers: int = 0,
+                remote_batch_size: int = 4, remote_timeout: float = 600.0, remote_retries: int = 3) -> Dict:
+    """
+    Load the hypergraph, precompute its dictionaries and connect to the
+    evaluation workers (local_workers of them are started on localhost,
+    standing in for remote_workers).
+
+    Returns
+    -------
+        the session, used by run_session and closed by close_session.
+    """
+    hypergraph = load_hypergraph(hypergraph_path)
+    print(hypergraph)
+
+    # degree, hyperdegree, neighbor list, incident hyperedge list pre-computation
+    # note: in order to significantly reduce the execution time, we store the
+    # degree of the nodes, the hyperdegree of the nodes and the list of neighbors
+    # of each node in dictionary data structures
+    nodes = hypergraph.get_nodes()
+    degree_dict:Dict[int,int] = dict()
+    hyperdegree_dict:Dict[int,int] = dict()
+    neighbor_dict:Dict[int,List[int]] = dict()
+    incident_hyperedge_dict:Dict[int,List[Tuple[int]]] = dict()
+    for n in nodes:
+        degree_dict[n] = len(hypergraph.get_neighbors(n))
+        hyperdegree_dict[n] = hypergraph.degree(n)
+        neighbor_dict[n] = hypergraph.get_neighbors(n)
+        incident_hyperedge_dict[n] = hypergraph.get_incident_edges(n)
+
+    session = {"hypergraph_path": hypergraph_path, "hypergraph": hypergraph, "nodes": nodes,
+               "degree_dict": degree_dict, "hyperdegree_dict": hyperdegree_dict,
+               "neighbor_dict": neighbor_dict, "incident_hyperedge_dict": incident_hyperedge_dict,
+               "local_workers": list(), "remote_pool": None,
+               "settings": {"hypergraph_path": hypergraph_path, "remote_workers": remote_workers, "local_workers": local_workers,
+                            "remote_batch_size": remote_batch_size, "remote_timeout": remote_timeout, "remote_retries": remote_retries}}
+
+    # evaluation workers on localhost, standing in for remote ones
+    if local_workers > 0:
+        session["local_workers"], remote_workers = start_local_workers(hypergraph_path, local_workers)
+    if remote_workers:
+        session["remote_pool"] = connect_workers(remote_workers, hypergraph, remote_batch_size, remote_timeout, remote_retries)
+
+    return session
+
+def run_session(session: Dict, config: Dict, output_folder_run_path: str, rng: random.Random = None) -> Tuple[List,List]:
+    """
+    Run the multi-objective evolutionary algorithm with the configuration in
+    the session, writing its streamed files and checkpoint in
+    output_folder_run_path (which must exist).
+
+    Parameters
+    ----------
+    config : dict
+        arguments of main.py, the missing ones take their default value
+    rng : random.Random
+        pseudo-random number generator of the run, by default a new one
+        initialized with config["random_seed"]
+
+    Returns
+    -------
+        the Pareto front and the final population, as returned by
+        moea_influence_maximization.
+    """
+    args = default_config()
+    unknown = [key for key in config if key not in args]
+    if unknown:
+        raise ValueError(f"unknown arguments {unknown}")
+    args.update(config)
+    fixed = [key for key in SESSION_ARGUMENTS if key in config and config[key] != session["settings"][key]]
+    if fixed:
+        raise ValueError(f"arguments {fixed} are fixed by the session")
+    if rng is None:
+        rng = random.Random(args["random_seed"])
+
+    hypergraph = session["hypergraph"]
+    checkpoint_file_path = f"{output_folder_run_path}/{args['output_checkpoint_file_name']}"
+
+    if args["resume"] is not None and args["checkpoint_interval"] > 0 and os.path.exists(checkpoint_file_path):
+        # a resumed run starts from the population of its checkpoint, which
+        # also restores the state of the pseudo-random number generator
+        initial_population = None
+    else:
+        # seed sets of previous solutions injected into the initial population,
+        # the rest of which is built by the smart initialization
+        warm_start = list()
+        if args["warm_start_file_paths"]:
+            warm_start_size = args["warm_start_size"] if args["warm_start_size"] is not None else args["population_size"]//2
+            warm_start = warm_start_population(file_paths=args["warm_start_file_paths"],
+                                               hypergraph=hypergraph,
+                                               min_k=args["min_seed_nodes"],
+                                               max_k=INIT_SEED_SET_SIZE,
+                                               n=min(warm_start_size, args["population_size"]),
+                                               prng=rng)
+
+        # smart initialization
+        initial_population = warm_start + create_initial_population(hypergraph=hypergraph,
+                                                                    min_k=args["min_seed_nodes"],
+                                                                    max_k=INIT_SEED_SET_SIZE,
+                                                                    n=args["population_size"]-len(warm_start),
+                                                                    degree_function=node_degree,
+                                                                    prng=rng)
+        #print(f"initial_population: {initial_population}")
+        print(f"len(initial_population): {len(initial_population)}")
+
+    # run multi-objective evolutionary algorithm optimization
+    return moea_influence_maximization(session=session,
+                                       config=args,
+                                       random_gen=rng,
+                                       initial_population=initial_population,
+                                       max_seed_nodes=INIT_SEED_SET_SIZE/hypergraph.num_nodes(),
+                                       output_folder_run_path=output_folder_run_path)
+
+def close_session(session: Dict):
+    """
+    Close the connections to the evaluation workers and stop the local ones.
+    """
+    if session["remote_pool"] is not None:
+        close_workers(session["remote_pool"])
+        session["remote_pool"] = None
+    stop_local_workers(session["local_workers"])
+    session["local_workers"] = list()
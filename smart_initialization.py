@@ -1,6 +1,10 @@
 from typing import Dict, Set, Tuple, List, Callable
 import hypergraphx as hgx
 import random
+import math
+import heapq
+import json
+from loaders import node_ranking, top_k_nodes
 
 def create_initial_population(hypergraph: hgx.Hypergraph,
                               min_k: int,
@@ -30,7 +34,8 @@ def create_initial_population(hypergraph: hgx.Hypergraph,
         Number of individuals of the initial population.
     
     degree_function : Calleble[[hgx.Hypergraph, int], int]
-        Degree or hyperdegree of input node n
+        Degree or hyperdegree of input node n (e.g. loaders.node_degree). The
+        degrees and the ranking of the nodes are cached per degree_function.
     
     prng : random.Random
         Pseudo-random generator.
@@ -46,68 +51,132 @@ def create_initial_population(hypergraph: hgx.Hypergraph,
     # at random from the entire node set V
     for _ in range(int(n//2)):
         # extract random number in 1,max_seed_nodes and initialize individual genome
-        individual_size = random.randint(min_k, max_k)
+        individual_size = prng.randint(min_k, max_k)
         individuals.append(prng.sample(hypergraph.get_nodes(), individual_size))
 
-    # select a subset of nodes characterized by high degree centrality
+    # select a subset of nodes characterized by high degree centrality (the
+    # degrees and the ranking of the nodes are cached, see loaders.node_ranking)
     nodes_filtered = filter_nodes(hypergraph, degree_function)
-    all_nodes = hypergraph.get_nodes().copy()
+    node_degree = node_ranking(hypergraph, degree_function)["score"]
 
     if len(nodes_filtered)<max_k:
         # if might very well happen that the number of filtered nodes is smaller
         # than the maximum seed set size. If this is the case we consider
         # the N nodes with the highest degree. N in this case is k+r such that
         # r is a random number between 0 and (len(hypergraph.get_nodes()-len(nodes_filtered))/2)
-        all_nodes_degree = [degree_function(hypergraph, node) for node in all_nodes]
-        sorted_all_nodes = [node for _, node in sorted(zip(all_nodes_degree, all_nodes), key=lambda x: x[0], reverse=True)]
-        all_nodes_degree_sorted = sorted(all_nodes_degree, reverse=True)
-
         num_nodes_filtered = max_k+prng.randint(0, (len(hypergraph.get_nodes())-max_k)//2)
         
-        nodes_filtered = sorted_all_nodes[:num_nodes_filtered]
+        nodes_filtered = top_k_nodes(hypergraph, degree_function, num_nodes_filtered)
+        top_nodes = set(nodes_filtered)
+        other_nodes = [node for node in hypergraph.get_nodes() if node not in top_nodes]
         
-        for i in range(num_nodes_filtered):
-            # with probability 0.5, we replace each node currently in
-            # nodes_filtered with a random node sampled from the hypergraph randomly
-            if prng.random()<0.5:
-                random_node = prng.choices(sorted_all_nodes[num_nodes_filtered:], weights=all_nodes_degree_sorted[num_nodes_filtered:], k=1)[0]
-                nodes_filtered[i] = random_node
-                all_nodes_degree_sorted.pop(sorted_all_nodes.index(random_node))
-                sorted_all_nodes.remove(random_node)
+        # with probability 0.5, we replace each node currently in
+        # nodes_filtered with a random node sampled from the rest of the
+        # hypergraph with probability proportional to its degree, without
+        # replacement
+        replaced = [i for i in range(num_nodes_filtered) if prng.random()<0.5]
+        random_nodes = weighted_sample(other_nodes, [node_degree[node] for node in other_nodes], len(replaced), prng)
+        for i, random_node in zip(replaced, random_nodes):
+            nodes_filtered[i] = random_node
 
     # choose n/2 individuals containing k nodes, chosen from the input hypergraph
     # with probabilities proportional to their degrees.
     sorted_nodes = sorted(nodes_filtered)
-    nodes_degree = [degree_function(hypergraph, node) for node in sorted_nodes]
+    nodes_degree = [node_degree[node] for node in sorted_nodes]
     for _ in range(n//2):
-        nodes_ = sorted_nodes.copy()
-        probs_ = nodes_degree.copy()
-
-        new_individual = []
         new_individual_size = prng.randint(min_k, max_k)
-
-        for _ in range(new_individual_size):
-            new_node = prng.choices(nodes_, probs_)[0]
-            probs_.pop(nodes_.index(new_node))
-            nodes_.remove(new_node)
-            new_individual.append(new_node)
-        individuals.append(new_individual)
+        individuals.append(weighted_sample(sorted_nodes, nodes_degree, new_individual_size, prng))
 
     print(f"len(individuals): {len(individuals)}")
 
     return individuals
 
-def filter_nodes(hypergraph: hgx.Hypergraph, degree_function: Callable[[hgx.Hypergraph, int], int], percentage:int=30):
-    # calculate the degree for each node
-    node_degrees = {node: degree_function(hypergraph, node) for node in hypergraph.get_nodes()}
+def warm_start_population(file_paths: List[str],
+                          hypergraph: hgx.Hypergraph,
+                          min_k: int,
+                          max_k: int,
+                          n: int,
+                          prng: random.Random)->List[List[int]]:
+    """
+    Seed sets of baseline output files (e.g. hdd.json, high_degree.json,
+    hci.json) or of previous Pareto fronts (moea.json), to be injected into
+    the initial population.
+    - The nodes which are not in the hypergraph are dropped, the seed sets
+    are clipped to their first max_k nodes (the baselines list the nodes in
+    the order they selected them) and the ones smaller than min_k are dropped.
+    - Seed sets with the same nodes are kept once.
+    - If more than n seed sets are left, n of them are chosen uniformly at
+    random.
+
+    Parameters
+    ----------
+    file_paths : list[str]
+        File paths of the JSON files, each one holding a list of seed sets.
+
+    n : int
+        Maximum number of seed sets returned.
+
+    Returns
+    -------
+        Seed sets of the files, in the order of the files.
+    """
+    nodes = set(hypergraph.get_nodes())
+    seed_sets = dict()                                                          # canonical seed set -> seed set
+    for file_path in file_paths:
+        input_file = open(file_path)
+        for a in json.load(input_file):
+            a = list(dict.fromkeys(node for node in a if node in nodes))[:max_k]
+            if len(a) >= min_k:
+                seed_sets.setdefault(frozenset(a), a)
+        input_file.close()
+
+    seed_sets = list(seed_sets.values())
+    if len(seed_sets) > n:
+        chosen = sorted(prng.sample(range(len(seed_sets)), n))
+        seed_sets = [seed_sets[i] for i in chosen]
+
+    print(f"warm start seed sets: {len(seed_sets)}")
+
+    return seed_sets
+
+def weighted_sample(population: List[int], weights: List[float], k: int, prng: random.Random) -> List[int]:
+    """
+    Sample k elements of the population without replacement, with probability
+    proportional to their weights, in O(|population| + k log |population|).
+
+    Each element gets the exponential key -log(u)/w, with u uniform in (0,1],
+    and the k elements with the smallest keys are returned in increasing key
+    order. This has the same distribution, order included, as k successive
+    prng.choices(population, weights) each removing the chosen element
+    (Efraimidis and Spirakis, 2006). Elements with weight 0 come last.
+
+    Parameters
+    ----------
+    population : list[int]
+        Elements to sample from.
+
+    weights : list[float]
+        Non-negative weight of each element.
+
+    k : int
+        Number of elements to sample (all of them if k exceeds the population).
 
-    # sort nodes by degree in descending order
-    sorted_nodes = sorted(node_degrees.keys(), key=lambda x: node_degrees[x], reverse=True)
+    prng : random.Random
+        Pseudo-random generator.
 
+    Returns
+    -------
+        The sampled elements, in the order in which they are drawn.
+    """
+    keys = [(-math.log(1.0-prng.random())/w if w > 0 else math.inf, i) for i, w in enumerate(weights)]
+    heapq.heapify(keys)
+    return [population[heapq.heappop(keys)[1]] for _ in range(min(k, len(keys)))]
+
+def filter_nodes(hypergraph: hgx.Hypergraph, degree_function: Callable[[hgx.Hypergraph, int], int], percentage:int=30):
     # calculate the number of nodes to select (default 30% of total nodes)
-    num_nodes_to_select = int((percentage/100)*len(sorted_nodes))
+    num_nodes_to_select = int((percentage/100)*len(hypergraph.get_nodes()))
 
     # get the top nodes with the highest degrees
-    output_nodes = sorted([node for node in sorted_nodes[:num_nodes_to_select]])
+    output_nodes = sorted(top_k_nodes(hypergraph, degree_function, num_nodes_to_select))
 
     return output_nodes
\ No newline at end of file
@@ -0,0 +1,169 @@
+from typing import Dict, List
+import os
+import json
+import time
+import argparse
+import collections
+import urllib.request
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from loaders import load_hypergraph
+from remote_evaluation import hypergraph_index, evaluate_batch
+
+# Long-running local spread-evaluation service.
+#
+# The service loads the hypergraphs of the data directory once (on start or at
+# their first query) together with their degree, neighbor and incident
+# hyperedge index, and answers batched spread queries over local HTTP:
+#
+#   POST /spread    {"dataset": "restaurant", "seed_sets": [[1, 2], [3]],
+#                    "model": "WC", "no_simulations": 100, "max_hop": 5,
+#                    "threshold": 0.8, "p_min": 0.005, "p_max": 0.02,
+#                    "random_seed": 42}
+#                   -> {"results": [{"influence_mean": ..., "influence_std": ...,
+#                       "influence_fraction": ..., "activation_attempts": ...,
+#                       "cached": ...}, ...]}
+#   GET  /datasets  -> names of the loaded hypergraphs
+#   GET  /stats     -> size, hits and misses of the result cache
+#
+# The pseudo-random number generator of a seed set is seeded from the query
+# parameters and the seed set itself, so the answer to a query does not depend
+# on the other seed sets of the batch nor on the cache, which keeps the most
+# recently used results up to a maximum size. Queries are answered one at a
+# time, the propagation models being CPU bound.
+
+QUERY_PARAMETERS = ["model", "no_simulations", "max_hop", "threshold", "p_min", "p_max", "random_seed"]
+
+def new_service(data_dir: str, cache_size: int) -> Dict:
+    return {"data_dir": data_dir, "indexes": dict(), "cache": collections.OrderedDict(), "cache_size": cache_size,
+            "hits": 0, "misses": 0}
+
+def dataset_index(service: Dict, dataset: str) -> Dict:
+    """
+    Index of the hypergraph data_dir/dataset.json, loaded at its first use.
+    """
+    if dataset not in service["indexes"]:
+        file_path = os.path.join(service["data_dir"], f"{dataset}.json")
+        if os.path.basename(dataset) != dataset or not os.path.exists(file_path):
+            raise FileNotFoundError(f"unknown dataset {dataset}")
+        service["indexes"][dataset] = hypergraph_index(load_hypergraph(file_path))
+    return service["indexes"][dataset]
+
+def spread_query(service: Dict, query: Dict) -> Dict:
+    """
+    Answer a spread query, see the description of the module.
+    """
+    if query.get("model") not in ["WC", "LT", "SICP"]:
+        raise ValueError(f"invalid propagation model {query.get('model')}")
+    index = dataset_index(service, query["dataset"])
+    num_nodes = len(index["hypergraph"].get_nodes())
+    parameters = tuple(query.get(p) for p in QUERY_PARAMETERS)
+    settings = dict(zip(QUERY_PARAMETERS, parameters))
+    cache = service["cache"]
+
+    # seed sets which are not in the cache, each one evaluated once
+    keys = [(query["dataset"], parameters, tuple(sorted(set(a)))) for a in query["seed_sets"]]
+    cached = [key in cache for key in keys]
+    missing = list(dict.fromkeys(key for key, hit in zip(keys, cached) if not hit))
+    seeds = ["/".join(str(x) for x in (query["dataset"],) + parameters + key[2]) for key in missing]
+    for key, result in zip(missing, evaluate_batch(index, [list(key[2]) for key in missing], seeds, settings)):
+        cache[key] = result
+
+    results = list()
+    for key, hit in zip(keys, cached):
+        cache.move_to_end(key)
+        influence_mean, influence_std, attempts = cache[key]
+        results.append({"influence_mean": influence_mean, "influence_std": influence_std,
+                        "influence_fraction": influence_mean/num_nodes, "activation_attempts": attempts, "cached": hit})
+    while len(cache) > service["cache_size"]:
+        cache.popitem(last=False)
+
+    service["hits"] += sum(cached)
+    service["misses"] += len(missing)
+    return {"results": results}
+
+class SpreadRequestHandler(BaseHTTPRequestHandler):
+    # the service is set by run_service
+    service = None
+
+    def send_json(self, status: int, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/datasets":
+            self.send_json(200, sorted(self.service["indexes"]))
+        elif self.path == "/stats":
+            self.send_json(200, {"cache_size": len(self.service["cache"]), "hits": self.service["hits"], "misses": self.service["misses"]})
+        else:
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/spread":
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+            return
+        try:
+            query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            start_time = time.time()
+            answer = spread_query(self.service, query)
+            answer["seconds"] = time.time() - start_time
+        except FileNotFoundError as e:
+            self.send_json(404, {"error": str(e)})
+        except (KeyError, TypeError, ValueError) as e:
+            self.send_json(400, {"error": f"invalid query: {e!r}"})
+        else:
+            self.send_json(200, answer)
+
+def run_service(data_dir: str, datasets: List[str], host: str, port: int, cache_size: int):
+    """
+    Load the datasets and answer the queries forever.
+    """
+    service = new_service(data_dir, cache_size)
+    for dataset in datasets:
+        dataset_index(service, dataset)
+    SpreadRequestHandler.service = service
+    server = HTTPServer((host, port), SpreadRequestHandler)
+    print(f"spread service listening on http://{host}:{server.server_address[1]}")
+    server.serve_forever()
+
+# === CLIENT ===================================================================
+def query_spread(url: str, dataset: str, seed_sets: List[List[int]], model: str, no_simulations: int, max_hop: int,
+                 threshold: float = None, p_min: float = None, p_max: float = None, random_seed: int = 42,
+                 timeout: float = None) -> List[Dict]:
+    """
+    Ask the spread service at url (e.g. http://127.0.0.1:8050) the spread of the
+    seed sets on the dataset (the name of its JSON file in the data directory
+    of the service).
+
+    Returns
+    -------
+        for each seed set, a dict with influence_mean, influence_std,
+        influence_fraction, activation_attempts and cached.
+    """
+    query = {"dataset": dataset, "seed_sets": [list(a) for a in seed_sets], "model": model, "no_simulations": no_simulations,
+             "max_hop": max_hop, "threshold": threshold, "p_min": p_min, "p_max": p_max, "random_seed": random_seed}
+    request = urllib.request.Request(f"{url}/spread", data=json.dumps(query).encode(), headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())["results"]
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Local spread-evaluation service.")
+
+    parser.add_argument("--data_dir", type=str, default="data", help="Directory of the hypergraph dataset, a dataset is queried by the name of its JSON file.")
+    parser.add_argument("--datasets", type=str, nargs="*", default=[], help="Datasets loaded at start, the other ones are loaded at their first query.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on.")
+    parser.add_argument("--port", type=int, default=8050, help="Port to listen on.")
+    parser.add_argument("--cache_size", type=int, default=100000, help="Maximum number of seed set results kept in the cache.")
+
+    args = parser.parse_args()
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+    run_service(args["data_dir"], args["datasets"], args["host"], args["port"], args["cache_size"])
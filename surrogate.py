@@ -0,0 +1,146 @@
+from typing import Dict, Set, Tuple, List
+import numpy as np
+import inspyred
+
+# Surrogate pre-screening of the offspring.
+#
+# The spread of a seed set is predicted by a linear model of cheap one-hop
+# features, computed with the propagation model of the run and fitted online
+# by least squares to the seed sets already evaluated by Monte Carlo
+# simulation. An offspring is simulated only if, with an
+# optimistic estimate of its spread (prediction plus z times the standard
+# deviation of the residuals), it is not dominated by the current Pareto
+# archive; otherwise it gets the surrogate fitness, flagged as approximate.
+
+def approximate_pareto(values: List[float]) -> inspyred.ec.emo.Pareto:
+    """
+    Pareto fitness computed with the surrogate instead of the Monte Carlo
+    simulation, flagged by its approximate attribute. Note: it is not a
+    subclass of Pareto, since Python would then give precedence to its
+    reflected comparisons and Pareto.__gt__ would recurse forever.
+    """
+    fitness = inspyred.ec.emo.Pareto(values)
+    fitness.approximate = True
+    return fitness
+
+def new_surrogate(z: float, min_samples: int, max_samples: int) -> Dict:
+    """
+    Empty surrogate model.
+
+    Parameters
+    ----------
+    z : float
+        number of residual standard deviations added to the prediction to
+        decide whether an offspring is promising
+    min_samples : int
+        number of simulated seed sets needed before screening the offspring
+    max_samples : int
+        number of most recent simulated seed sets the model is fitted to
+    """
+    return {"z": z, "min_samples": min_samples, "max_samples": max_samples,
+            "features": [], "targets": [], "coefficients": None, "residual_std": None}
+
+def first_hop_activations(a: Set[int], args) -> float:
+    """
+    Expected number of nodes activated at the first hop by seed set a under
+    the propagation model of the run:
+
+    - WC: a node m with c seed neighbors gets active with probability
+      1-(1-1/degree(m))^c;
+    - LT: the nodes of the hyperedges of the seeds whose fraction of seeds
+      reaches the threshold get active (the model is deterministic);
+    - SICP: each seed n chooses one of its hyperedges uniformly at random and
+      infects each of its nodes with probability (p_min+p_max)/2 on average,
+      hence a node m in k of the hyperedges of n escapes it with probability
+      1-(k/hyperdegree(n))*(p_min+p_max)/2.
+    """
+    model = args["propagation_model"]
+    if model == "WC":
+        seed_neighbors = dict()
+        for n in a:
+            for m in args["neighbor_dict"][n]:
+                if m not in a:
+                    seed_neighbors[m] = seed_neighbors.get(m, 0) + 1
+        return sum(1 - (1 - 1/args["degree_dict"][m])**c for m, c in seed_neighbors.items())
+    if model == "LT":
+        activated = set()
+        for n in a:
+            for h in args["incident_hyperedge_dict"][n]:
+                if len(a.intersection(h))/len(h) >= args["threshold"]:
+                    activated.update(h)
+        return len(activated - a)
+    # SICP
+    p = (args["p_min"] + args["p_max"]) / 2
+    escape = dict()
+    for n in a:
+        n_incident_hyperedges = args["incident_hyperedge_dict"][n]
+        counts = dict()
+        for e in n_incident_hyperedges:
+            for m in e:
+                if m not in a:
+                    counts[m] = counts.get(m, 0) + 1
+        for m, k in counts.items():
+            escape[m] = escape.get(m, 1.0) * (1 - k/len(n_incident_hyperedges)*p)
+    return sum(1 - q for q in escape.values())
+
+def surrogate_features(a: Set[int], args) -> List[float]:
+    """
+    One-hop features of a seed set: its size, the number of its neighbors and
+    their expected number of activations at the first hop under the
+    propagation model of the run (see first_hop_activations).
+    """
+    neighbors = set()
+    for n in a:
+        neighbors.update(args["neighbor_dict"][n])
+    neighbors.difference_update(a)
+    return [1.0, len(a), len(neighbors), first_hop_activations(a, args)]
+
+def add_samples(surrogate: Dict, features: List[List[float]], targets: List[float]):
+    """
+    Add simulated seed sets (features and Monte Carlo spread) to the surrogate
+    and fit it again.
+    """
+    surrogate["features"].extend(features)
+    surrogate["targets"].extend(targets)
+    del surrogate["features"][:-surrogate["max_samples"]]
+    del surrogate["targets"][:-surrogate["max_samples"]]
+    if len(surrogate["targets"]) < surrogate["min_samples"]:
+        return
+
+    X = np.array(surrogate["features"])
+    y = np.array(surrogate["targets"])
+    coefficients, _, _, _ = np.linalg.lstsq(X, y, rcond=None)
+    surrogate["coefficients"] = coefficients
+    surrogate["residual_std"] = float(np.std(y - X @ coefficients))
+
+def screen_offspring(candidates: List[List[int]], args) -> Tuple[List[int], Dict[int,inspyred.ec.emo.Pareto]]:
+    """
+    Split the candidates into the ones to be simulated and the ones which get
+    the surrogate fitness.
+
+    Returns
+    -------
+        the indexes of the candidates to be simulated, and the approximate
+        fitness of the other ones by index.
+    """
+    surrogate = args["surrogate"]
+    archive = args["_ec"].archive
+    if surrogate["coefficients"] is None or not archive:
+        return list(range(len(candidates))), dict()
+
+    num_nodes = len(args["hypergraph"].get_nodes())
+    max_seed_nodes = args["max_seed_nodes"]
+    margin = surrogate["z"] * surrogate["residual_std"]
+
+    simulate = list()
+    approximate = dict()
+    for index, a in enumerate(candidates):
+        a_set = set(a)
+        prediction = float(np.dot(surrogate["coefficients"], surrogate_features(a_set, args)))
+        size_objective = (max_seed_nodes+1-len(a_set))/max_seed_nodes
+        optimistic = inspyred.ec.emo.Pareto([(prediction + margin) / num_nodes, size_objective])
+        if any(ind.fitness > optimistic for ind in archive):
+            approximate[index] = approximate_pareto([max(prediction, 0.0) / num_nodes, size_objective])
+        else:
+            simulate.append(index)
+    return simulate, approximate
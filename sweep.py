@@ -0,0 +1,184 @@
+from typing import Dict, Tuple
+import os
+import csv
+import json
+import glob
+import random
+import argparse
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from tqdm import tqdm
+
+from config import default_config
+from session import new_session, run_session
+from evaluate_baselines import model_settings
+
+# Parameter sweep of the MOEA over a grid of propagation model settings and
+# datasets.
+#
+# A job is one run of the MOEA on one dataset with one parameter setting and
+# one random seed. The sessions of the datasets (hypergraph and pre-computed
+# dictionaries, see session.py) are opened once, before the worker processes
+# are forked, so the workers share them instead of loading the hypergraphs
+# again. The jobs of a dataset with the same random seed start from the same
+# state of the pseudo-random number generator, hence the same initial
+# population, whatever their parameter setting and the worker running them.
+# When the configuration turns delta evaluation on, the seed of its common
+# random numbers (see delta_evaluation.py) is derived from the random seed of
+# the job, unless the configuration sets crn_seed itself: every draw is a hash
+# of the world and of the nodes and hop involved, not of the position of a
+# pseudo-random number generator, hence a seed set is simulated on the same
+# random worlds under every setting and the results of neighboring settings
+# are directly comparable. Without delta evaluation the draws of a job follow
+# the pseudo-random number generator of the run, hence they depend on the
+# seed sets simulated before under the same setting. Each job writes the files
+# of main.py in its own folder and one row in the results table, which is
+# read back to skip the jobs already done when the sweep is executed again.
+
+# columns of the results table, the first ones identify a job
+KEY_COLUMNS = ["dataset", "model", "max_hop", "threshold", "p_min", "p_max", "random_seed"]
+VALUE_COLUMNS = ["hv", "front_size", "num_evaluations", "generations", "seconds", "output_folder_path"]
+
+# sessions of the datasets, opened by the main process and inherited by the
+# worker processes
+sessions = dict()
+
+def job_key(job: Dict) -> Tuple[str]:
+    """
+    Key identifying a job, as read back from the results table.
+    """
+    return tuple("" if job[c] is None else str(job[c]) for c in KEY_COLUMNS)
+
+def job_folder_name(job: Dict) -> str:
+    return "_".join(f"{c}={job[c]}" for c in KEY_COLUMNS[1:] if job[c] is not None)
+
+def job_crn_seed(random_seed: int) -> int:
+    """
+    Seed of the random worlds of the jobs with the given random seed.
+    """
+    return random.Random(f"crn/{random_seed}").getrandbits(64)
+
+def run_job(job: Dict, config: Dict, out_dir: str) -> Dict:
+    """
+    Run the MOEA for one job in the session of its dataset, and return its
+    row of the results table.
+
+    Parameters
+    ----------
+    config : dict
+        arguments of main.py shared by all the jobs
+    """
+    session = sessions[job["dataset"]]
+    output_folder_path = os.path.join(out_dir, job["dataset"], job_folder_name(job))
+    os.makedirs(output_folder_path, exist_ok=True)
+
+    # the parameters of the model left empty keep their default value
+    job_config = dict(config)
+    job_config.update({c: job[c] for c in ["model", "max_hop", "threshold", "p_min", "p_max", "random_seed"] if job[c] is not None})
+    job_config["hypergraph_path"] = session["hypergraph_path"]
+    # common random numbers, the same for all the jobs with the same seed
+    if job_config.get("delta_evaluation") and job_config.get("crn_seed") is None:
+        job_config["crn_seed"] = job_crn_seed(job["random_seed"])
+
+    start_time = time.time()
+    pareto_front, _ = run_session(session, job_config, output_folder_path, rng=random.Random(job["random_seed"]))
+    seconds = time.time() - start_time
+
+    # save hypergraph pareto front
+    output_file = open(os.path.join(output_folder_path, default_config()["output_file_name"]), "w")
+    output_file.write(json.dumps([index[0] for index in pareto_front], indent=1))
+    output_file.close()
+
+    # HV and number of evaluations of the last generation
+    generations_file = open(os.path.join(output_folder_path, default_config()["output_generations_file_name"]), newline="")
+    last = list(csv.DictReader(generations_file))[-1]
+    generations_file.close()
+
+    row = dict(job)
+    row.update({"hv": last["hv"], "front_size": len(pareto_front), "num_evaluations": last["num_evaluations"],
+                "generations": last["generation"], "seconds": seconds, "output_folder_path": output_folder_path})
+    return row
+
+def read_arguments():
+    parser = argparse.ArgumentParser(description="Parameter sweep of the MOEA over propagation model settings and datasets.")
+
+    parser.add_argument("--hypergraph_paths", type=str, nargs="+", default=None, help="File paths of the JSON files encoding the hypergraphs (default: every JSON file in --data_dir).")
+    parser.add_argument("--data_dir", type=str, default="data", help="Directory of the hypergraph dataset.")
+    parser.add_argument("--models", type=str, nargs="+", default=["LT", "SICP"], choices=["WC", "LT", "SICP"], help="Propagation models.")
+    parser.add_argument("--max_hops", type=int, nargs="+", default=[5], help="Numbers of max hops.")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.6, 0.7, 0.8, 0.9], help="Thresholds of the LT model.")
+    parser.add_argument("--p_mins", type=float, nargs="+", default=[0.001, 0.005, 0.01], help="Minimum probabilities of the SICP model (paired with --p_maxs).")
+    parser.add_argument("--p_maxs", type=float, nargs="+", default=[0.01, 0.02, 0.05], help="Maximum probabilities of the SICP model (paired with --p_mins).")
+    parser.add_argument("--random_seeds", type=int, nargs="+", default=[42], help="Seeds of the runs of each setting, shared by all the settings.")
+    parser.add_argument("--config", type=str, default="{}", help="Other arguments of main.py shared by all the jobs, as a JSON object (e.g. '{\"max_generations\": 50}'). With '{\"delta_evaluation\": true}' the jobs with the same random seed are simulated on common random numbers.")
+    parser.add_argument("--n_jobs", type=int, default=1, help="Number of jobs run in parallel, each by its own process.")
+
+    parser.add_argument("--out_dir", type=str, default="output/sweep", help="Location of the output directory of the jobs.")
+    parser.add_argument("--output_file_path", type=str, default="output/sweep/results.csv", help="File path of the CSV file where to store the results (appended, the jobs already in it are skipped).")
+
+    args = parser.parse_args()
+    args = vars(args)
+
+    return args
+
+if __name__ == '__main__':
+    args = read_arguments()
+    config = json.loads(args["config"])
+
+    hypergraph_paths = args["hypergraph_paths"]
+    if hypergraph_paths is None:
+        hypergraph_paths = sorted(glob.glob(os.path.join(args["data_dir"], "*.json")))
+    datasets = {os.path.splitext(os.path.basename(path))[0]: path for path in hypergraph_paths}
+
+    # jobs already in the results table
+    done = set()
+    if os.path.exists(args["output_file_path"]):
+        output_file = open(args["output_file_path"], newline="")
+        for row in csv.DictReader(output_file):
+            done.add(tuple(row[c] for c in KEY_COLUMNS))
+        output_file.close()
+
+    # one job for each (dataset, parameter setting, random seed)
+    settings = model_settings(args["models"], args["max_hops"], args["thresholds"], args["p_mins"], args["p_maxs"])
+    jobs = list()
+    for dataset in datasets:
+        for setting in settings:
+            for random_seed in args["random_seeds"]:
+                job = {"dataset": dataset, "random_seed": random_seed}
+                job.update(setting)
+                if job_key(job) not in done:
+                    jobs.append(job)
+    print(f"{len(jobs)} jobs to run, {len(done)} already in {args['output_file_path']}")
+
+    if jobs:
+        for dataset in sorted({job["dataset"] for job in jobs}):
+            sessions[dataset] = new_session(datasets[dataset])
+
+        output_folder_path = os.path.dirname(args["output_file_path"])
+        if output_folder_path:
+            os.makedirs(output_folder_path, exist_ok=True)
+        write_header = not os.path.exists(args["output_file_path"]) or os.path.getsize(args["output_file_path"]) == 0
+        output_file = open(args["output_file_path"], "a", newline="")
+        writer = csv.DictWriter(output_file, fieldnames=KEY_COLUMNS+VALUE_COLUMNS)
+        if write_header:
+            writer.writeheader()
+
+        # rows are written as soon as they are available, so that an interrupted
+        # sweep can be resumed; the workers are forked to inherit the sessions.
+        # A failed job has no row, hence it is run again by the next execution
+        failed = list()
+        with ProcessPoolExecutor(max_workers=args["n_jobs"], mp_context=multiprocessing.get_context("fork")) as executor:
+            futures = {executor.submit(run_job, job, config, args["out_dir"]): job for job in jobs}
+            for future in tqdm(as_completed(futures), total=len(futures), desc="Processing jobs"):
+                try:
+                    row = future.result()
+                except Exception as e:
+                    print(f"job {futures[future]} failed: {e!r}")
+                    failed.append(futures[future])
+                    continue
+                writer.writerow(row)
+                output_file.flush()
+        output_file.close()
+        if failed:
+            print(f"{len(failed)} jobs failed, they are run again by the next execution of the sweep")
@@ -0,0 +1,59 @@
+import os
+import pytest
+
+from loaders import load_hypergraph, node_degree, top_k_nodes
+from delta_evaluation import delta_monte_carlo_max_hop_simulation
+from remote_evaluation import hypergraph_index
+from sweep import model_settings, job_crn_seed
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+# values of the parameters not used by a setting
+UNUSED = {"threshold": 0.8, "p_min": 0.001, "p_max": 0.01}
+
+@pytest.fixture(scope="module")
+def index():
+    return hypergraph_index(load_hypergraph(os.path.join(DATA_DIR, "restaurant.json")))
+
+def simulate(index, setting, crn_seed, seed_set, parent=None, parent_state=None):
+    parameters = {c: setting[c] if setting[c] is not None else UNUSED[c] for c in UNUSED}
+    return delta_monte_carlo_max_hop_simulation(hypergraph=index["hypergraph"],
+                                                degree_dict=index["degree_dict"],
+                                                neighbor_dict=index["neighbor_dict"],
+                                                incident_hyperedge_dict=index["incident_hyperedge_dict"],
+                                                a=seed_set,
+                                                t=parameters["threshold"],
+                                                p_min=parameters["p_min"],
+                                                p_max=parameters["p_max"],
+                                                no_simulations=10,
+                                                max_hop=setting["max_hop"],
+                                                model=setting["model"],
+                                                crn_seed=crn_seed,
+                                                parent=parent,
+                                                parent_state=parent_state)[3]
+
+def outcomes(state):
+    # activation hop of every node and activation attempts of every world
+    return [(world["label"], world["hist"], world["attempts"]) for world in state]
+
+def test_job_crn_seed():
+    assert job_crn_seed(42) == job_crn_seed(42)
+    assert job_crn_seed(42) != job_crn_seed(43)
+
+@pytest.mark.parametrize("random_seed", [42, 43])
+def test_common_random_numbers(index, random_seed):
+    """
+    The settings draw the same random worlds for the same seed set, whatever
+    the settings simulated before and the evaluation path (simulated from
+    scratch or repaired from the state of a parent seed set, as in a run).
+    """
+    settings = model_settings(["WC", "LT", "SICP"], [2, 5], [0.6, 0.9], [0.001, 0.01], [0.01, 0.05])
+    crn_seed = job_crn_seed(random_seed)
+    top_nodes = top_k_nodes(index["hypergraph"], node_degree, 11)
+    a, parent = set(top_nodes[:10]), set(top_nodes)
+
+    states = [outcomes(simulate(index, setting, crn_seed, a)) for setting in settings]
+    # the settings again, in reverse order and repairing the state of a parent
+    for setting, state in reversed(list(zip(settings, states))):
+        parent_state = simulate(index, setting, crn_seed, parent)
+        assert outcomes(simulate(index, setting, crn_seed, a, parent, parent_state)) == state